@@ -0,0 +1,36 @@
+import csv
+
+from libs.load_file import rpq_load_file
+from libs.rpq_resolver import CarlierBudget, CarlierStrategy, SchrageLogNResolver, CarlierResolver
+
+# node count comparison of Carlier with and without elimination rules
+
+
+def main():
+    filenames = [f'data.00{i}' for i in range(0, 9)]
+    budget = CarlierBudget(max_nodes=5000, max_stagnation=None)
+
+    resolvers = []
+    for strategy in [CarlierStrategy.BFS, CarlierStrategy.Normal]:
+        for elimination in [False, True]:
+            resolvers.append((f'{strategy.name}:elimination={elimination}',
+                              CarlierResolver(strategy, SchrageLogNResolver, budget, elimination=elimination)))
+
+    with open('carlier_report.csv', 'w', newline='') as output:
+        writer = csv.writer(output, delimiter=';')
+        writer.writerow(('nazwa', 'plik', 'cmax', 'dolne_ograniczenie', 'optymalne', 'wezly', 'wyeliminowane', 'czas'))
+
+        for filename in filenames:
+            task_t = tuple(rpq_load_file(filename))
+            for name, resolver in resolvers:
+                result = resolver.solve([*task_t])
+                stats = result.stats
+                time = stats.schrage_time + stats.bound_time
+                writer.writerow((name, filename, result.c_max, result.lower_bound, result.proven_optimal,
+                                 stats.expanded, stats.eliminated, f'{time:.3f}'))
+                print(f'{filename} {name}: cmax={result.c_max} lb={result.lower_bound} '
+                      f'nodes={stats.expanded} stop={result.stop_reason}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+from libs.flowshop_benchmark import families, run_benchmark, save_baseline, load_baseline, compare
+from libs.resolver import JohnsonResolver, NehResolver, TsResolver, IterNoStopOption
+
+
+def main():
+    parser = argparse.ArgumentParser(description='flowshop resolvers benchmark')
+    parser.add_argument('--families', nargs='+', default=['taillard_20x5'], choices=families())
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--warm-up', type=int, default=1)
+    parser.add_argument('--save', help='write results as baseline json')
+    parser.add_argument('--baseline', help='compare results with baseline json')
+    parser.add_argument('--quality-tolerance', type=float, default=0.0)
+    parser.add_argument('--throughput-tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    # tabu search is random, so it is stopped by iterations for stable load
+    resolvers = [
+        JohnsonResolver(),
+        NehResolver(),
+        TsResolver(first_order=NehResolver(), stop_option=IterNoStopOption(100)),
+        ]
+
+    report = run_benchmark(resolvers, args.families, args.repetitions, args.warm_up)
+
+    if args.save:
+        save_baseline(args.save, report)
+
+    if args.baseline:
+        regressions = compare(report, load_baseline(args.baseline), args.quality_tolerance, args.throughput_tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression.key} {regression.metric}: {regression.baseline} -> {regression.current}')
+        if len(regressions) != 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
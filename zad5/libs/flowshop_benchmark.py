@@ -0,0 +1,166 @@
+from dataclasses import dataclass, asdict
+from statistics import median
+from time import perf_counter_ns
+from typing import Callable, Dict, List
+import glob
+import json
+import os
+import platform
+import random
+
+from .grouped_tasks import GroupedTasks
+from .helpers import get_c_max
+from .kernels import kernel_calls
+from .load_file import load_file
+from .generators import TAILLARD_SEEDS, taillard_flowshop
+
+# Flowshop resolvers over registered instance families. Each (resolver,
+# instance) pair is run after warm up for given repetitions, results are
+# kept as JSON baseline and later runs are compared against it.
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# family name -> function returning {instance name: GroupedTasks}
+_families: Dict[str, Callable[[], Dict[str, GroupedTasks]]] = {}
+
+
+def register_family(name):
+    def register(function):
+        _families[name] = function
+        return function
+    return register
+
+
+def families():
+    return list(_families.keys())
+
+
+def load_family(name) -> Dict[str, GroupedTasks]:
+    return _families[name]()
+
+
+def _files_family(directory):
+    files = sorted(glob.glob(os.path.join(_ROOT, '..', directory, 'data*.txt')))
+    return lambda: {f'{directory}/{os.path.basename(file)}': load_file(file) for file in files}
+
+
+register_family('zad2')(_files_family('zad2'))
+register_family('zad3')(_files_family('zad3'))
+
+for (tasks_no, machines_no), seeds in TAILLARD_SEEDS.items():
+    register_family(f'taillard_{tasks_no}x{machines_no}')(
+        lambda tasks_no=tasks_no, machines_no=machines_no, seeds=seeds: {
+            f'ta_{tasks_no}x{machines_no}_{i}': taillard_flowshop(seed, tasks_no, machines_no)
+            for i, seed in enumerate(seeds)})
+
+
+@dataclass
+class BenchmarkResult:
+    resolver: str
+    instance: str
+    makespans: List[float]
+    times_ns: List[int]
+    evaluations: List[int]
+
+    def makespan(self):
+        return min(self.makespans)
+
+    def time_ns(self):
+        return median(self.times_ns)
+
+    def evaluations_per_second(self):
+        rates = [evaluations / time_ns * 1e9 for evaluations, time_ns in zip(self.evaluations, self.times_ns) if time_ns > 0]
+        return median(rates) if len(rates) != 0 else 0.0
+
+    def summary(self):
+        return {
+            'makespan': self.makespan(),
+            'time_ns': self.time_ns(),
+            'evaluations_per_second': self.evaluations_per_second(),
+            'raw': asdict(self),
+        }
+
+
+def run_once(resolver, grouped_tasks: GroupedTasks, seed=0):
+    # makespan, elapsed ns and c_max evaluations made by resolver, random
+    # resolvers draw from global random, seeding keeps runs comparable
+    random.seed(seed)
+    evaluations = kernel_calls['flowshop_c_max']
+    start = perf_counter_ns()
+    order = resolver.resolve(grouped_tasks)
+    elapsed = perf_counter_ns() - start
+    evaluations = kernel_calls['flowshop_c_max'] - evaluations
+    return float(get_c_max(grouped_tasks, order)), elapsed, evaluations
+
+
+def run_benchmark(resolvers, family_names, repetitions=3, warm_up=1, verbose=True) -> dict:
+    results = {}
+
+    for family in family_names:
+        for instance, grouped_tasks in load_family(family).items():
+            for resolver in resolvers:
+                for _ in range(warm_up):
+                    run_once(resolver, grouped_tasks)
+
+                result = BenchmarkResult(repr(resolver), instance, [], [], [])
+                for repetition in range(repetitions):
+                    makespan, time_ns, evaluations = run_once(resolver, grouped_tasks, repetition)
+                    result.makespans.append(makespan)
+                    result.times_ns.append(time_ns)
+                    result.evaluations.append(evaluations)
+
+                results[f'{result.resolver}|{instance}'] = result.summary()
+                if verbose:
+                    print(f'Done: {instance}--{resolver}: {result.makespan()} in {result.time_ns() / 1e6:.1f} ms')
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'repetitions': repetitions,
+            'warm_up': warm_up,
+            'families': list(family_names),
+        },
+        'results': results,
+    }
+
+
+def save_baseline(filename, report):
+    with open(filename, 'w') as file:
+        json.dump(report, file, indent=1)
+
+
+def load_baseline(filename):
+    with open(filename) as file:
+        return json.load(file)
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+
+def compare(report, baseline, quality_tolerance=0.0, throughput_tolerance=0.2) -> List[Regression]:
+    # makespan worse by more than quality_tolerance, median time higher or
+    # evaluations per second lower by more than throughput_tolerance, all
+    # relative to baseline. Time also covers resolvers making no c_max calls.
+    regressions = []
+
+    for key, current in report['results'].items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            continue
+
+        if current['makespan'] > previous['makespan'] * (1 + quality_tolerance):
+            regressions.append(Regression(key, 'makespan', previous['makespan'], current['makespan']))
+
+        if current['time_ns'] > previous['time_ns'] * (1 + throughput_tolerance):
+            regressions.append(Regression(key, 'time_ns', previous['time_ns'], current['time_ns']))
+
+        if current['evaluations_per_second'] < previous['evaluations_per_second'] * (1 - throughput_tolerance):
+            regressions.append(Regression(key, 'evaluations_per_second', previous['evaluations_per_second'], current['evaluations_per_second']))
+
+    return regressions
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from .grouped_tasks import GroupedTasks
+from .rpq_resolver import preemptive_schrage_lists
+
+# F||C_max lower bounds. Machine k is relaxed to 1|r_j,q_j,pmtn|C_max with
+# head r_j = sum of task times on machines before k and tail q_j = sum on
+# machines after k, which preemptive schrage solves exactly.
+
+
+@dataclass
+class FlowShopBounds:
+    # bound of each machine relaxation
+    machine_bounds: List[int]
+    # longest task over all machines
+    job_bound: int
+
+    def machine_bound(self):
+        return max(self.machine_bounds, default=0)
+
+    def lower_bound(self):
+        return max(self.machine_bound(), self.job_bound)
+
+
+def machine_lower_bounds(grouped_tasks: GroupedTasks) -> List[int]:
+    matrix = np.asarray(grouped_tasks.matrix, dtype=np.int64)
+    if grouped_tasks.tasks_no() == 0:
+        return [0] * grouped_tasks.machines_no()
+
+    heads = np.cumsum(matrix, axis=1) - matrix
+    tails = np.cumsum(matrix[:, ::-1], axis=1)[:, ::-1] - matrix
+    task_nos = range(grouped_tasks.tasks_no())
+
+    bounds = []
+    for machine in range(grouped_tasks.machines_no()):
+        _, c_max = preemptive_schrage_lists(
+            heads[:, machine].tolist(), matrix[:, machine].tolist(), tails[:, machine].tolist(), task_nos)
+        bounds.append(c_max)
+
+    return bounds
+
+
+def job_lower_bound(grouped_tasks: GroupedTasks) -> int:
+    if grouped_tasks.tasks_no() == 0:
+        return 0
+    return int(np.asarray(grouped_tasks.matrix, dtype=np.int64).sum(axis=1).max())
+
+
+def flowshop_bounds(grouped_tasks: GroupedTasks) -> FlowShopBounds:
+    return FlowShopBounds(machine_lower_bounds(grouped_tasks), job_lower_bound(grouped_tasks))
+
+
+def flowshop_lower_bound(grouped_tasks: GroupedTasks) -> int:
+    return flowshop_bounds(grouped_tasks).lower_bound()
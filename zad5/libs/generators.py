@@ -0,0 +1,110 @@
+from typing import List
+
+import numpy as np
+
+from .grouped_tasks import GroupedTasks
+from .rpq_task import RPQTask
+from .load_file import save_binary_file, rpq_save_binary_file
+
+# Instance generators drawing from explicit np.random.Generator, every
+# instance is one vectorised call. seed may be int, None or Generator. Given
+# filename, instance is also written in binary format from load_file.
+
+
+def _rng(seed) -> np.random.Generator:
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def random_grouped_tasks(tasks_no, machines_no, min_value=1, max_value=100, seed=None, filename=None) -> GroupedTasks:
+    # times from [min_value, max_value), like np.random.randint
+    matrix = _rng(seed).integers(min_value, max_value, size=(tasks_no, machines_no))
+    result = GroupedTasks(matrix.astype(float))
+    if filename is not None:
+        save_binary_file(filename, result)
+    return result
+
+
+def random_rpq_array(tasks_no, min_value, max_value, seed=None, filename=None) -> np.ndarray:
+    # (n, 3) array of R, P, Q from [min_value, max_value)
+    result = _rng(seed).integers(min_value, max_value, size=(tasks_no, 3), dtype=np.int64)
+    if filename is not None:
+        rpq_save_binary_file(filename, result)
+    return result
+
+
+def random_rpq_queue(tasks_no, min_value, max_value, seed=None, filename=None) -> List[RPQTask]:
+    values = random_rpq_array(tasks_no, min_value, max_value, seed, filename).tolist()
+    return [RPQTask(task, R, P, Q) for task, (R, P, Q) in enumerate(values)]
+
+
+# Taillard's generator: x' = 16807 * x mod (2^31 - 1), value is
+# low + floor(x' / (2^31 - 1) * (high - low + 1)). k-th draw is
+# seed * 16807^k mod (2^31 - 1), powers come from vectorised square and
+# multiply, so the whole stream is generated at once.
+_TAILLARD_A = 16807
+_TAILLARD_M = 2147483647
+
+# time seeds of published instances ta001-ta120 in order, (tasks, machines)
+# -> seeds of ten instances
+TAILLARD_SEEDS = {
+    (20, 5): [873654221, 379008056, 1866992158, 216771124, 495070989,
+              402959317, 1369363414, 2021925980, 573109518, 88325120],
+    (20, 10): [587595453, 1401007982, 873136276, 268827376, 1634173168,
+               691823909, 73807235, 1273398721, 2065119309, 1672900551],
+    (20, 20): [479340445, 268827376, 1958948863, 918272953, 555010963,
+               2010851491, 1519833303, 1748670931, 1923497586, 1829909967],
+    (50, 5): [1328042058, 200382020, 496319842, 1203030903, 1730708564,
+              450926852, 1303135678, 1273398721, 587288402, 248421594],
+    (50, 10): [1958948863, 575633267, 655816003, 1977864101, 93805469,
+               1803345551, 49612559, 1899802599, 2013025619, 578962478],
+    (50, 20): [1539989115, 691823909, 655816003, 1315102446, 1949668355,
+               1923497586, 1805594913, 1861070898, 715643788, 464843328],
+    (100, 5): [896678084, 1179439976, 1122278347, 416756875, 267829958,
+               1835213917, 1328833962, 1418570761, 161033112, 304212574],
+    (100, 10): [1539989115, 655816003, 960914243, 1915696806, 2013025619,
+                1168140026, 1923497586, 167698528, 1528387973, 993794175],
+    (100, 20): [450926852, 1462772409, 1021685265, 83696007, 508154254,
+                1861070898, 26482542, 444956424, 2115448041, 118254244],
+    (200, 10): [471503978, 1215892992, 135346136, 1602504050, 160037322,
+                551454346, 519485142, 383947510, 1968171878, 540872513],
+    (200, 20): [2013025619, 475051709, 914834335, 810642687, 1019331795,
+                2056065863, 1342855162, 1325809384, 1988803007, 765656702],
+    (500, 20): [1368624604, 450181436, 1927888393, 1759567256, 606425239,
+                19268348, 1298201670, 2041736264, 379756761, 28837162],
+}
+
+
+def taillard_stream(seed, count, low, high) -> np.ndarray:
+    exponents = np.arange(1, count + 1, dtype=np.int64)
+    powers = np.ones(count, dtype=np.int64)
+    base = _TAILLARD_A
+
+    # values stay below 2^31, products fit in int64
+    while exponents.any():
+        odd = (exponents & 1).astype(bool)
+        powers[odd] = powers[odd] * base % _TAILLARD_M
+        base = base * base % _TAILLARD_M
+        exponents >>= 1
+
+    states = powers * (seed % _TAILLARD_M) % _TAILLARD_M
+    return low + np.floor(states / _TAILLARD_M * (high - low + 1)).astype(np.int64)
+
+
+def taillard_flowshop(seed, tasks_no, machines_no, filename=None) -> GroupedTasks:
+    # times are drawn machine after machine, each for all tasks
+    times = taillard_stream(seed, tasks_no * machines_no, 1, 99).reshape(machines_no, tasks_no)
+    result = GroupedTasks(times.T.astype(float))
+    if filename is not None:
+        save_binary_file(filename, result)
+    return result
+
+
+def taillard_benchmark_set(tasks_no, machines_no, directory=None) -> List[GroupedTasks]:
+    # published instances of given size, written as directory/ta_<n>_<m>_<i>.npy
+    result = []
+    for i, seed in enumerate(TAILLARD_SEEDS[(tasks_no, machines_no)]):
+        filename = None if directory is None else f'{directory}/ta_{tasks_no}_{machines_no}_{i}.npy'
+        result.append(taillard_flowshop(seed, tasks_no, machines_no, filename))
+    return result
@@ -1,11 +1,11 @@
 from typing import List, Tuple
 import numpy as np
-import math
 
 from .grouped_tasks import GroupedTasks
 from .order import Order
 from typing import Iterable, Tuple
 from .rpq_task import RPQTask
+from .kernels import get_kernel
 
 
 def get_c_max(groupedTasks: GroupedTasks, order: Order) -> int:
@@ -15,29 +15,9 @@ def get_c_max(groupedTasks: GroupedTasks, order: Order) -> int:
 
 
 def get_partial_c_max(groupedTasks: GroupedTasks, order: Order, tasks_no) -> int:
-    # a[i] -> time when i-th machine is free
-    a = np.zeros(groupedTasks.machines_no())
-
-    for taskIdx in range(tasks_no):
-        # time when previous machine is free,
-        # relative to machine variable
-        previous_machine_end_time = 0
-
-        for machine in range(groupedTasks.machines_no()):
-
-            task_time = groupedTasks.matrix[order.order[taskIdx], machine]
-
-            if a[machine] > previous_machine_end_time:
-                # operation on previous machine was finished before
-                # operation on current machine could continue
-                a[machine] += task_time
-            else:
-                # next machine were free before end of previous operation
-                a[machine] = previous_machine_end_time + task_time
-
-            previous_machine_end_time = a[machine]
-
-    return a[groupedTasks.machines_no() - 1]
+    # c_max of first tasks_no tasks, backend is chosen in kernels
+    kernel = get_kernel('flowshop_c_max', tasks_no * groupedTasks.machines_no())
+    return kernel(groupedTasks.matrix, order.order, tasks_no)
 
 
 def pick_min(tasksQueue: List[int], groupedTasks: GroupedTasks) -> Tuple[int, int]:
@@ -115,32 +95,34 @@ def insert_into_task_order(order: Order, index, task_no) -> Order:
 
 
 def time_resolve(resolver, tasks: GroupedTasks):
-    from datetime import datetime
-    start = datetime.now()
+    # monotonic clock, result stays timedelta
+    from datetime import timedelta
+    from time import perf_counter
+    start = perf_counter()
     result = resolver.resolve(tasks)
-    end = datetime.now()
-    return (result, end - start)
+    return (result, timedelta(seconds=perf_counter() - start))
 
 
 def RPQtime_resolve(resolver, tasks: Iterable):
-    from datetime import datetime
-    start = datetime.now()
+    from time import perf_counter
+    start = perf_counter()
     result = resolver.resolve(queue=tasks)
-    end = datetime.now()
-    delta = end - start
-    return (result, delta.total_seconds() * 1000)
+    return (result, (perf_counter() - start) * 1000)
 
 
 def get_c_max_rpq(queue, order):
-    global_time = -math.inf
-    c_max = -math.inf
+    # queue is list of RPQTask or (n, 3) array, backend is chosen in kernels
+    return get_kernel('rpq_c_max', len(order.order))(queue, order.order)
+
+
+def get_witi_cost(queue, order):
+    # sum of weighted tardiness
+    time = 0
+    cost = 0
 
     for task_index in order.order:
-        if global_time < queue[task_index].R:
-            global_time = queue[task_index].R
-        global_time += queue[task_index].P
-        if global_time + queue[task_index].Q > c_max:
-            c_max = global_time + queue[task_index].Q
-
-    assert c_max != -math.inf
-    return c_max
+        time += queue[task_index].P
+        if time > queue[task_index].D:
+            cost += queue[task_index].W * (time - queue[task_index].D)
+
+    return cost
@@ -0,0 +1,56 @@
+from collections import Counter
+from time import perf_counter
+import json
+
+# Opt-in search instrumentation. Resolvers take instrumentation=None and only
+# check for None in their loops, so disabled instrumentation costs one
+# comparison. Counters are free form names, samples (iteration, time,
+# current, best) go to fixed size ring buffer which keeps the newest ones.
+
+
+class Instrumentation:
+    def __init__(self, capacity=1024, sample_every=1):
+        self.capacity = capacity
+        # only every n-th iteration is sampled
+        self.sample_every = sample_every
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()
+        self.buffer = [None] * self.capacity
+        # samples written so far, also position of the next one
+        self.samples_no = 0
+        self.start()
+
+    def start(self):
+        # sample times are relative to last start
+        self.start_time = perf_counter()
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def sample(self, iteration, current, best):
+        if iteration % self.sample_every != 0 or self.capacity == 0:
+            return
+        self.buffer[self.samples_no % self.capacity] = (iteration, perf_counter() - self.start_time, current, best)
+        self.samples_no += 1
+
+    def samples(self):
+        # oldest to newest
+        if self.samples_no <= self.capacity:
+            return self.buffer[:self.samples_no]
+        split = self.samples_no % self.capacity
+        return self.buffer[split:] + self.buffer[:split]
+
+    def dropped(self):
+        # samples overwritten by newer ones
+        return max(0, self.samples_no - self.capacity)
+
+    def export_jsonl(self, filename, label=None, append=False):
+        # counters record followed by one record per sample
+        with open(filename, 'a' if append else 'w') as file:
+            file.write(json.dumps({'type': 'counters', 'label': label, 'dropped': self.dropped(), **self.counters}) + '\n')
+            for iteration, time, current, best in self.samples():
+                file.write(json.dumps({
+                    'type': 'sample', 'label': label, 'iteration': iteration,
+                    'time': time, 'current': float(current), 'best': float(best)}) + '\n')
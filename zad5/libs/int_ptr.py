@@ -1,5 +1,22 @@
 from dataclasses import dataclass
+import multiprocessing
 
 @dataclass
 class IntPtr:
     val: int
+
+# IntPtr living in shared memory, visible to all worker processes
+class SharedIntPtr:
+    def __init__(self, val, shared=None):
+        self.shared = shared if shared is not None else multiprocessing.Value('d', val)
+
+    @property
+    def val(self):
+        return self.shared.value
+
+    @val.setter
+    def val(self, val):
+        self.shared.value = val
+
+    def get_lock(self):
+        return self.shared.get_lock()
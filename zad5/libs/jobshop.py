@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from collections import deque
+from typing import List
+
+# Job shop instance and its disjunctive graph. Operations are numbered job
+# after job, so operations of job j are a contiguous range. Graph keeps for
+# each operation its job and machine predecessor/successor (-1 if none),
+# heads (longest path from start to operation start) and tails (longest path
+# from operation end to the end of schedule).
+
+
+@dataclass
+class JobShop:
+    jobs_no: int
+    machines_no: int
+    # per operation
+    machine: List[int]
+    time: List[int]
+    job: List[int]
+    # first operation of each job, jobs_no + 1 entries
+    job_start: List[int]
+
+    def operations_no(self):
+        return len(self.time)
+
+    def machine_operations(self):
+        result = [[] for _ in range(self.machines_no)]
+        for operation, machine in enumerate(self.machine):
+            result[machine].append(operation)
+        return result
+
+
+class DisjunctiveGraph:
+    def __init__(self, jobshop: JobShop):
+        self.jobshop = jobshop
+        n = jobshop.operations_no()
+        self.time = jobshop.time
+        # upper limit of any path, longer heads mean there is a cycle
+        self.time_sum = sum(jobshop.time)
+
+        self.job_prev = [-1] * n
+        self.job_next = [-1] * n
+        for job in range(jobshop.jobs_no):
+            for operation in range(jobshop.job_start[job] + 1, jobshop.job_start[job + 1]):
+                self.job_prev[operation] = operation - 1
+                self.job_next[operation - 1] = operation
+
+        self.machine_prev = [-1] * n
+        self.machine_next = [-1] * n
+        self.sequences = [None] * jobshop.machines_no
+
+        self.heads = [0] * n
+        self.tails = [0] * n
+        self.recompute()
+
+    def copy(self):
+        result = DisjunctiveGraph.__new__(DisjunctiveGraph)
+        result.jobshop = self.jobshop
+        result.time = self.time
+        result.time_sum = self.time_sum
+        result.job_prev = self.job_prev
+        result.job_next = self.job_next
+        result.machine_prev = list(self.machine_prev)
+        result.machine_next = list(self.machine_next)
+        result.sequences = [None if sequence is None else list(sequence) for sequence in self.sequences]
+        result.heads = list(self.heads)
+        result.tails = list(self.tails)
+        return result
+
+    def makespan(self):
+        heads, tails, time = self.heads, self.tails, self.time
+        return max(heads[operation] + time[operation] + tails[operation] for operation in range(len(time)))
+
+    def _link(self, sequence):
+        for prev, next in zip(sequence, sequence[1:]):
+            self.machine_next[prev] = next
+            self.machine_prev[next] = prev
+
+    def _unlink(self, sequence):
+        for operation in sequence:
+            self.machine_prev[operation] = -1
+            self.machine_next[operation] = -1
+
+    def topological_order(self):
+        # Kahn's algorithm, None if selected arcs make a cycle
+        n = len(self.time)
+        job_prev, machine_prev = self.job_prev, self.machine_prev
+        job_next, machine_next = self.job_next, self.machine_next
+
+        in_degree = [(job_prev[operation] != -1) + (machine_prev[operation] != -1) for operation in range(n)]
+        ready = deque(operation for operation in range(n) if in_degree[operation] == 0)
+        order = []
+
+        while len(ready) != 0:
+            operation = ready.popleft()
+            order.append(operation)
+            for next in (job_next[operation], machine_next[operation]):
+                if next != -1:
+                    in_degree[next] -= 1
+                    if in_degree[next] == 0:
+                        ready.append(next)
+
+        return order if len(order) == n else None
+
+    def recompute(self) -> bool:
+        # full O(V + E) heads and tails update
+        order = self.topological_order()
+        if order is None:
+            return False
+
+        heads, tails, time = self.heads, self.tails, self.time
+        job_prev, machine_prev = self.job_prev, self.machine_prev
+        job_next, machine_next = self.job_next, self.machine_next
+
+        for operation in order:
+            head = 0
+            for prev in (job_prev[operation], machine_prev[operation]):
+                if prev != -1 and heads[prev] + time[prev] > head:
+                    head = heads[prev] + time[prev]
+            heads[operation] = head
+
+        for operation in reversed(order):
+            tail = 0
+            for next in (job_next[operation], machine_next[operation]):
+                if next != -1 and tails[next] + time[next] > tail:
+                    tail = tails[next] + time[next]
+            tails[operation] = tail
+
+        return True
+
+    def _propagate(self, changed) -> bool:
+        # new arcs only make paths longer, so heads and tails are increased
+        # starting from changed operations until nothing changes
+        heads, tails, time = self.heads, self.tails, self.time
+        job_prev, machine_prev = self.job_prev, self.machine_prev
+        job_next, machine_next = self.job_next, self.machine_next
+
+        work = deque(changed)
+        while len(work) != 0:
+            operation = work.popleft()
+            head = heads[operation]
+            for prev in (job_prev[operation], machine_prev[operation]):
+                if prev != -1 and heads[prev] + time[prev] > head:
+                    head = heads[prev] + time[prev]
+            if head > heads[operation]:
+                if head > self.time_sum:
+                    return False
+                heads[operation] = head
+            for next in (job_next[operation], machine_next[operation]):
+                if next != -1 and heads[operation] + time[operation] > heads[next]:
+                    work.append(next)
+
+        work = deque(changed)
+        while len(work) != 0:
+            operation = work.popleft()
+            tail = tails[operation]
+            for next in (job_next[operation], machine_next[operation]):
+                if next != -1 and tails[next] + time[next] > tail:
+                    tail = tails[next] + time[next]
+            if tail > tails[operation]:
+                if tail > self.time_sum:
+                    return False
+                tails[operation] = tail
+            for prev in (job_prev[operation], machine_prev[operation]):
+                if prev != -1 and tails[operation] + time[operation] > tails[prev]:
+                    work.append(prev)
+
+        return True
+
+    def set_sequence(self, machine, sequence) -> bool:
+        # select machine arcs, heads and tails are updated incrementally,
+        # returns False and leaves graph unchanged if sequence makes a cycle
+        if self.sequences[machine] is not None:
+            self.clear_sequence(machine)
+
+        heads, tails = list(self.heads), list(self.tails)
+        self.sequences[machine] = list(sequence)
+        self._link(sequence)
+
+        if not self._propagate(sequence):
+            self._unlink(sequence)
+            self.sequences[machine] = None
+            self.heads, self.tails = heads, tails
+            return False
+
+        return True
+
+    def clear_sequence(self, machine):
+        # paths can get shorter, so it needs full update
+        self._unlink(self.sequences[machine])
+        self.sequences[machine] = None
+        self.recompute()
+
+
+def get_c_max_jobshop(jobshop: JobShop, order) -> int:
+    # order holds operation sequence for each machine, None if it has a cycle
+    graph = DisjunctiveGraph(jobshop)
+    for machine, sequence in enumerate(order.order):
+        graph.sequences[machine] = list(sequence)
+        graph._link(sequence)
+    if not graph.recompute():
+        return None
+    return graph.makespan()
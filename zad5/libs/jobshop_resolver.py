@@ -0,0 +1,225 @@
+import math
+
+from .order import Order
+from .rpq_task import RPQTask
+from .jobshop import JobShop, DisjunctiveGraph
+from .resolver import StopOption, TimeStopOption, TsResolver
+from .rpq_resolver import SchrageLogNResolver, CarlierResolver, CarlierStrategy, CarlierBudget
+
+# J||C_max resolvers. Result order is Order holding list of operation
+# sequences, one per machine, operations numbered as in JobShop.
+
+
+class JobShopResolver:
+    def resolve(self, jobshop: JobShop) -> Order:
+        raise RuntimeError("JobShopResolver::resolve(...): method not implemented")
+
+
+class ShiftingBottleneckResolver(JobShopResolver):
+    def __init__(self, single_machine=None, reoptimize=True):
+        # any RPQResolver, carlier is cut by budget so big instances stay fast
+        if single_machine is None:
+            single_machine = CarlierResolver(CarlierStrategy.BFS, SchrageLogNResolver, CarlierBudget(max_nodes=50))
+        self.single_machine = single_machine
+        self.reoptimize = reoptimize
+
+    def __repr__(self):
+        return f'ShiftingBottleneckResolver({self.single_machine})'
+
+    def _sequence_machine(self, graph: DisjunctiveGraph, operations):
+        # 1|r_j,q_j|C_max with heads as R and tails as Q, queue index is
+        # position in operations
+        queue = [RPQTask(i, graph.heads[operation], graph.time[operation], graph.tails[operation])
+                 for i, operation in enumerate(operations)]
+        order, c_max = self.single_machine.resolve(queue)
+        # carlier returns IntPtr
+        c_max = getattr(c_max, 'val', c_max)
+        return [operations[i] for i in order.order], c_max
+
+    def _fix_machine(self, graph: DisjunctiveGraph, machine, operations):
+        sequence, _ = self._sequence_machine(graph, operations)
+        if not graph.set_sequence(machine, sequence):
+            # single machine relaxation ignores delayed precedences, schrage
+            # respects heads and tails so it can't close a cycle
+            sequence, _ = SchrageLogNResolver().resolve(
+                [RPQTask(i, graph.heads[operation], graph.time[operation], graph.tails[operation])
+                 for i, operation in enumerate(operations)])
+            graph.set_sequence(machine, [operations[i] for i in sequence.order])
+
+    def _reoptimize(self, graph: DisjunctiveGraph, scheduled, machine_operations):
+        # resequence each already fixed machine with the others fixed, keep
+        # new sequence only when makespan doesn't get worse
+        for machine in scheduled:
+            old_sequence = graph.sequences[machine]
+            old_c_max = graph.makespan()
+
+            graph.clear_sequence(machine)
+            self._fix_machine(graph, machine, machine_operations[machine])
+
+            if graph.makespan() > old_c_max:
+                graph.clear_sequence(machine)
+                graph.set_sequence(machine, old_sequence)
+
+    def resolve(self, jobshop: JobShop) -> Order:
+        graph = DisjunctiveGraph(jobshop)
+        machine_operations = jobshop.machine_operations()
+        unscheduled = [machine for machine in range(jobshop.machines_no) if len(machine_operations[machine]) != 0]
+        scheduled = []
+
+        while len(unscheduled) != 0:
+            # bottleneck is machine with the biggest single machine makespan
+            bottleneck, bottleneck_c_max, bottleneck_sequence = None, -1, None
+            for machine in unscheduled:
+                sequence, c_max = self._sequence_machine(graph, machine_operations[machine])
+                if c_max > bottleneck_c_max:
+                    bottleneck, bottleneck_c_max, bottleneck_sequence = machine, c_max, sequence
+
+            unscheduled.remove(bottleneck)
+            if not graph.set_sequence(bottleneck, bottleneck_sequence):
+                self._fix_machine(graph, bottleneck, machine_operations[bottleneck])
+            scheduled.append(bottleneck)
+
+            if self.reoptimize and len(scheduled) > 1:
+                self._reoptimize(graph, scheduled[:-1], machine_operations)
+
+        order = Order([graph.sequences[machine] or [] for machine in range(jobshop.machines_no)])
+        return [order, graph.makespan()]
+
+
+class JobShopTsResolver(JobShopResolver):
+    # tabu search in N5 neighbourhood: swaps of first two and last two
+    # operations of critical blocks. Moves are scored by head and tail
+    # estimate, only the chosen one rebuilds heads and tails.
+    def __init__(self,
+            first_order: JobShopResolver=ShiftingBottleneckResolver(SchrageLogNResolver(), reoptimize=False),
+            tabu_list_length=10,
+            stop_option: StopOption=TimeStopOption(5)):
+        self.first_order = first_order
+        self.tabu_list_length = tabu_list_length
+        self.stop_option = stop_option
+
+    def __repr__(self):
+        return f'JobShopTsResolver:first_order={self.first_order}:tabu_list_length={self.tabu_list_length}:stop_option={self.stop_option}'
+
+    def _critical_blocks(self, graph: DisjunctiveGraph, c_max):
+        # walk one critical path from start, split it into runs of operations
+        # connected by machine arcs
+        heads, tails, time = graph.heads, graph.tails, graph.time
+        job_next, machine_next = graph.job_next, graph.machine_next
+
+        operation = next(operation for operation in range(len(time))
+                         if heads[operation] == 0 and time[operation] + tails[operation] == c_max)
+        blocks = [[operation]]
+
+        while True:
+            end = heads[operation] + time[operation]
+            following = machine_next[operation]
+            if following != -1 and heads[following] == end and end + time[following] + tails[following] == c_max:
+                blocks[-1].append(following)
+            else:
+                following = job_next[operation]
+                if following == -1 or heads[following] != end or end + time[following] + tails[following] != c_max:
+                    break
+                blocks.append([following])
+            operation = following
+
+        return blocks
+
+    def _moves(self, blocks):
+        moves = set()
+        for i, block in enumerate(blocks):
+            if len(block) < 2:
+                continue
+            # swaps inside first block's start and last block's end can't
+            # shorten the path
+            if i != 0:
+                moves.add((block[0], block[1]))
+            if i != len(blocks) - 1:
+                moves.add((block[-2], block[-1]))
+        return list(moves)
+
+    def _estimate(self, graph: DisjunctiveGraph, move):
+        # c_max lower estimate of swapping adjacent u, v on one machine,
+        # recomputes heads and tails of u and v only
+        heads, tails, time = graph.heads, graph.tails, graph.time
+        u, v = move
+
+        def head_of(prev):
+            return heads[prev] + time[prev] if prev != -1 else 0
+
+        def tail_of(next):
+            return tails[next] + time[next] if next != -1 else 0
+
+        head_v = max(head_of(graph.machine_prev[u]), head_of(graph.job_prev[v]))
+        head_u = max(head_v + time[v], head_of(graph.job_prev[u]))
+        tail_u = max(tail_of(graph.machine_next[v]), tail_of(graph.job_next[u]))
+        tail_v = max(tail_u + time[u], tail_of(graph.job_next[v]))
+
+        return max(head_v + time[v] + tail_v, head_u + time[u] + tail_u)
+
+    def _swap(self, graph: DisjunctiveGraph, move):
+        u, v = move
+        machine = graph.jobshop.machine[u]
+        sequence = graph.sequences[machine]
+        position = sequence.index(u)
+        sequence[position], sequence[position + 1] = v, u
+
+        before, after = graph.machine_prev[u], graph.machine_next[v]
+        if before != -1:
+            graph.machine_next[before] = v
+        if after != -1:
+            graph.machine_prev[after] = u
+        graph.machine_prev[v], graph.machine_next[v] = before, u
+        graph.machine_prev[u], graph.machine_next[u] = v, after
+
+    def resolve(self, jobshop: JobShop) -> Order:
+        first_order, _ = self.first_order.resolve(jobshop)
+
+        graph = DisjunctiveGraph(jobshop)
+        for machine, sequence in enumerate(first_order.order):
+            graph.sequences[machine] = list(sequence)
+            graph._link(sequence)
+        graph.recompute()
+
+        current_c_max = graph.makespan()
+        best = [list(sequence) for sequence in graph.sequences]
+        best_c_max = current_c_max
+
+        # tabu list holds arcs (u, v) that moves may not bring back
+        tabu_list = TsResolver.TabuList(self.tabu_list_length)
+        self.stop_option.start()
+
+        while not self.stop_option.should_stop():
+            moves = self._moves(self._critical_blocks(graph, current_c_max))
+            if len(moves) == 0:
+                # single block critical path, schedule is optimal
+                break
+
+            best_move, best_move_c_max = None, math.inf
+            for move in moves:
+                c_max = self._estimate(graph, move)
+
+                # tabu move is allowed only if it gives new best
+                if (move[1], move[0]) in tabu_list and c_max >= best_c_max:
+                    continue
+
+                if c_max < best_move_c_max:
+                    best_move, best_move_c_max = move, c_max
+
+            self.stop_option.next_iter()
+
+            if best_move is None:
+                # everything is tabu, take the oldest forbidden move
+                best_move = min(moves, key=lambda move: list(tabu_list.tabu_history).index((move[1], move[0])))
+
+            self._swap(graph, best_move)
+            # critical swaps in N5 never close a cycle
+            graph.recompute()
+            tabu_list.add(best_move)
+
+            current_c_max = graph.makespan()
+            if current_c_max < best_c_max:
+                best_c_max = current_c_max
+                best = [list(sequence) for sequence in graph.sequences]
+
+        return [Order(best), best_c_max]
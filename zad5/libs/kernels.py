@@ -0,0 +1,248 @@
+from collections import Counter
+from itertools import islice
+from time import perf_counter
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from .rpq_task import RPQTask
+
+# Interchangeable backends of core evaluators. Every kernel has the same
+# signature in each backend, get_kernel picks one for given input size from
+# micro benchmark ran on first use. Backend can be forced with set_backend or
+# SPD_KERNEL_BACKEND environment variable, unavailable backend falls back to
+# automatic choice.
+
+BACKENDS = ('python', 'numpy', 'numba')
+
+# name -> backend -> function
+_kernels = {}
+# name -> function(size, rng) returning (kernel args, size)
+_samples = {}
+# name -> [(size, backend)] sorted by size, filled by benchmark
+_choices = {}
+
+_override = os.environ.get('SPD_KERNEL_BACKEND')
+
+# name -> number of get_kernel calls, each evaluator call asks for kernel once
+kernel_calls = Counter()
+
+BENCHMARK_SIZES = (16, 256, 4096)
+
+
+def kernel(name, backend):
+    def register(function):
+        _kernels.setdefault(name, {})[backend] = function
+        return function
+    return register
+
+
+def kernel_sample(name):
+    def register(function):
+        _samples[name] = function
+        return function
+    return register
+
+
+def backends(name):
+    return list(_kernels[name].keys())
+
+
+def set_backend(backend=None):
+    # None restores automatic choice
+    global _override
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f'set_backend(...): unknown backend {backend}')
+    _override = backend
+
+
+def benchmark_kernel(name, sizes=BENCHMARK_SIZES, repeat=5):
+    # returns {size: {backend: best time in seconds}}
+    rng = np.random.default_rng(0)
+    result = {}
+
+    for size in sizes:
+        args, size = _samples[name](size, rng)
+        result[size] = {}
+        for backend, function in _kernels[name].items():
+            # first call compiles numba kernels
+            function(*args)
+            best = float('inf')
+            for _ in range(repeat):
+                start = perf_counter()
+                function(*args)
+                best = min(best, perf_counter() - start)
+            result[size][backend] = best
+
+    return result
+
+
+def _choose(name):
+    if name not in _choices:
+        timings = benchmark_kernel(name)
+        _choices[name] = sorted((size, min(times, key=times.get)) for size, times in timings.items())
+    return _choices[name]
+
+
+def get_kernel(name, size):
+    kernel_calls[name] += 1
+    functions = _kernels[name]
+    if _override in functions:
+        return functions[_override]
+    if len(functions) == 1:
+        return next(iter(functions.values()))
+
+    # backend that won at the biggest benchmarked size not above given one
+    backend = _choose(name)[0][1]
+    for choice_size, choice_backend in _choose(name):
+        if choice_size > size:
+            break
+        backend = choice_backend
+    return functions[backend]
+
+
+# flowshop: c_max of first tasks_no tasks of order, matrix is (tasks, machines)
+
+
+def _order_array(order, tasks_no):
+    if isinstance(order, np.ndarray):
+        return order[:tasks_no]
+    return np.fromiter(islice(order, tasks_no), dtype=np.intp, count=tasks_no)
+
+
+@kernel('flowshop_c_max', 'python')
+def flowshop_c_max_python(matrix, order, tasks_no):
+    rows = matrix[_order_array(order, tasks_no)].tolist()
+    # a[i] -> time when i-th machine is free
+    a = [0] * matrix.shape[1]
+
+    for row in rows:
+        previous_machine_end_time = 0
+        for machine, task_time in enumerate(row):
+            if a[machine] > previous_machine_end_time:
+                a[machine] += task_time
+            else:
+                a[machine] = previous_machine_end_time + task_time
+            previous_machine_end_time = a[machine]
+
+    return a[-1]
+
+
+@kernel('flowshop_c_max', 'numpy')
+def flowshop_c_max_numpy(matrix, order, tasks_no):
+    # C[i, k] = max(C[i - 1, k], C[i, k - 1]) + p[i, k], for one machine it is
+    # S[i] + max over j <= i of (C[j, k - 1] - S[j - 1]) with S prefix sum of p
+    rows = matrix[_order_array(order, tasks_no)]
+    if len(rows) == 0:
+        return 0
+
+    previous = np.zeros(len(rows), dtype=rows.dtype)
+    for machine in range(rows.shape[1]):
+        times = rows[:, machine]
+        prefix = np.cumsum(times)
+        previous = prefix + np.maximum.accumulate(previous - prefix + times)
+
+    return previous[-1]
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _flowshop_c_max_numba(matrix, order):
+        a = np.zeros(matrix.shape[1], dtype=matrix.dtype)
+        for task in order:
+            previous_machine_end_time = 0
+            for machine in range(matrix.shape[1]):
+                a[machine] = max(a[machine], previous_machine_end_time) + matrix[task, machine]
+                previous_machine_end_time = a[machine]
+        return a[-1]
+
+    @kernel('flowshop_c_max', 'numba')
+    def flowshop_c_max_numba(matrix, order, tasks_no):
+        return _flowshop_c_max_numba(matrix, _order_array(order, tasks_no))
+
+
+@kernel_sample('flowshop_c_max')
+def _flowshop_sample(size, rng):
+    machines = 10
+    tasks = max(1, size // machines)
+    matrix = rng.integers(1, 100, size=(tasks, machines)).astype(float)
+    order = list(rng.permutation(tasks))
+    return (matrix, order, tasks), tasks * machines
+
+
+# 1|r_j,q_j|C_max of given order, queue is list of RPQTask or (n, 3) array of
+# R, P, Q, indexed by task_no
+
+
+def _rpq_columns(queue):
+    if isinstance(queue, np.ndarray):
+        return queue[:, 0], queue[:, 1], queue[:, 2]
+    n = len(queue)
+    R = np.fromiter((task.R for task in queue), dtype=np.int64, count=n)
+    P = np.fromiter((task.P for task in queue), dtype=np.int64, count=n)
+    Q = np.fromiter((task.Q for task in queue), dtype=np.int64, count=n)
+    return R, P, Q
+
+
+@kernel('rpq_c_max', 'python')
+def rpq_c_max_python(queue, order):
+    if isinstance(queue, np.ndarray):
+        queue = [RPQTask(i, *task) for i, task in enumerate(queue.tolist())]
+
+    global_time = -float('inf')
+    c_max = -float('inf')
+
+    for task_index in order:
+        task = queue[task_index]
+        if global_time < task.R:
+            global_time = task.R
+        global_time += task.P
+        if global_time + task.Q > c_max:
+            c_max = global_time + task.Q
+
+    assert c_max != -float('inf')
+    return c_max
+
+
+@kernel('rpq_c_max', 'numpy')
+def rpq_c_max_numpy(queue, order):
+    # C[i] = max(C[i - 1], R[i]) + P[i] = S[i] + max over j <= i of (R[j] - S[j - 1])
+    R, P, Q = _rpq_columns(queue)
+    order = np.asarray(order, dtype=np.intp)
+    assert len(order) != 0
+
+    R, P, Q = R[order], P[order], Q[order]
+    prefix = np.cumsum(P)
+    C = prefix + np.maximum.accumulate(R - prefix + P)
+    return int((C + Q).max())
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _rpq_c_max_numba(R, P, Q, order):
+        global_time = R[order[0]]
+        c_max = 0
+        for task_index in order:
+            global_time = max(global_time, R[task_index]) + P[task_index]
+            c_max = max(c_max, global_time + Q[task_index])
+        return c_max
+
+    @kernel('rpq_c_max', 'numba')
+    def rpq_c_max_numba(queue, order):
+        R, P, Q = _rpq_columns(queue)
+        order = np.asarray(order, dtype=np.intp)
+        assert len(order) != 0
+        return int(_rpq_c_max_numba(R, P, Q, order))
+
+
+@kernel_sample('rpq_c_max')
+def _rpq_sample(size, rng):
+    values = rng.integers(1, 1000, size=(size, 3)).tolist()
+    queue = [RPQTask(i, *task) for i, task in enumerate(values)]
+    order = list(rng.permutation(size))
+    return (queue, order), size
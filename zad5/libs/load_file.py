@@ -3,6 +3,8 @@ import heapq
 
 from .grouped_tasks import GroupedTasks
 from .rpq_task import RPQTask
+from .jobshop import JobShop
+from .witi_task import WiTiTask
 
 
 def load_file(filename: str) -> GroupedTasks:
@@ -47,3 +49,76 @@ def rpq_load_file(filename: str):
             #heapq.heappush(queue, (rpq_task.prepare_time, rpq_task))
 
     return queue
+
+
+# witi file: number of tasks, then "p w d" line for each task
+
+
+def witi_load_file(filename: str):
+    with open(filename) as file:
+        tasks = int(file.readline().split()[0])
+
+        queue = []
+        for task in range(tasks):
+            line = file.readline()
+            P, W, D = tuple(int(s) for s in line.split())
+            queue.append(WiTiTask(task, P, W, D))
+
+    return queue
+
+
+# job shop file: "jobs machines operations" then for each job number of its
+# operations followed by (machine, time) pairs, machines are numbered from 1
+
+
+def jobshop_load_file(filename: str) -> JobShop:
+    with open(filename) as file:
+        first_line = file.readline()
+        jobs, machines, operations = tuple(int(s) for s in first_line.split())
+
+        machine = []
+        time = []
+        job = []
+        job_start = [0]
+
+        for job_no in range(jobs):
+            line = file.readline()
+            values = tuple(int(s) for s in line.split())
+            operations_no = values[0]
+            assert len(values) == 1 + 2 * operations_no
+
+            for i in range(operations_no):
+                machine.append(values[1 + 2 * i] - 1)
+                time.append(values[2 + 2 * i])
+                job.append(job_no)
+            job_start.append(len(time))
+
+        assert len(time) == operations
+
+        return JobShop(jobs, machines, machine, time, job, job_start)
+
+
+# binary format is .npy file with int64 array, (tasks, machines) for flowshop
+# and (tasks, 3) of R, P, Q for rpq
+
+
+def save_binary_file(filename: str, grouped_tasks: GroupedTasks):
+    np.save(filename, np.asarray(grouped_tasks.matrix, dtype=np.int64))
+
+
+def load_binary_file(filename: str) -> GroupedTasks:
+    matrix = np.load(filename)
+    assert matrix.ndim == 2
+    return GroupedTasks(matrix.astype(float))
+
+
+def rpq_save_binary_file(filename: str, queue):
+    if not isinstance(queue, np.ndarray):
+        queue = [(task.R, task.P, task.Q) for task in queue]
+    np.save(filename, np.asarray(queue, dtype=np.int64).reshape(-1, 3))
+
+
+def rpq_load_binary_file(filename: str):
+    values = np.load(filename)
+    assert values.ndim == 2 and values.shape[1] == 3
+    return [RPQTask(task, R, P, Q) for task, (R, P, Q) in enumerate(values.tolist())]
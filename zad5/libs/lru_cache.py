@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+# dict bounded to max_size, least recently used entries are dropped first
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        entries = self.entries
+        if key not in entries:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        entries.move_to_end(key)
+        return entries[key]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+
+        entries = self.entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
@@ -0,0 +1,173 @@
+from dataclasses import dataclass, asdict
+from statistics import median
+from typing import Callable, Dict, List
+import json
+import os
+import subprocess
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+from .generators import random_grouped_tasks, random_rpq_queue
+from .helpers import get_partial_c_max, get_c_max_rpq, decay_grouped_tasks_to_2_machines
+from .load_file import load_file
+from .order import Permutation
+from .priority_queue import PriorityQueue
+from .resolver import TsResolver
+
+# Micro benchmarks of hot primitives. Each benchmark is setup(size, rng,
+# directory) returning function timed without arguments, so preparing input
+# is not measured. directory is temporary and removed after timing. Results
+# are appended to JSON lines store together with commit, so runs of different
+# commits can be compared.
+
+# name -> setup(size, rng, directory) -> function
+_benchmarks: Dict[str, Callable] = {}
+
+
+def microbenchmark(name):
+    def register(setup):
+        _benchmarks[name] = setup
+        return setup
+    return register
+
+
+def benchmarks():
+    return list(_benchmarks.keys())
+
+
+@microbenchmark('get_partial_c_max')
+def _get_partial_c_max(size, rng, directory):
+    grouped_tasks = random_grouped_tasks(size, 20, seed=rng)
+    order = Permutation(rng.permutation(size))
+    return lambda: get_partial_c_max(grouped_tasks, order, size)
+
+
+@microbenchmark('get_c_max_rpq')
+def _get_c_max_rpq(size, rng, directory):
+    queue = random_rpq_queue(size, 1, 2000, seed=rng)
+    order = Permutation(rng.permutation(size))
+    return lambda: get_c_max_rpq(queue, order)
+
+
+@microbenchmark('priority_queue_push_pop')
+def _priority_queue_push_pop(size, rng, directory):
+    # size pushes followed by size pops
+    values = rng.integers(0, 1 << 30, size=size).tolist()
+
+    def run():
+        queue = PriorityQueue()
+        for value in values:
+            queue.push(value)
+        while queue.len() != 0:
+            queue.pop()
+    return run
+
+
+@microbenchmark('tabu_list_contains')
+def _tabu_list_contains(size, rng, directory):
+    # list of size orders of 20 tasks, looked up order is not there
+    tabu_list = TsResolver.TabuList(size)
+    for _ in range(size):
+        tabu_list.add(Permutation(rng.permutation(20)))
+    missing = Permutation(np.arange(20))
+    return lambda: missing in tabu_list
+
+
+@microbenchmark('decay_grouped_tasks_to_2_machines')
+def _decay_grouped_tasks_to_2_machines(size, rng, directory):
+    grouped_tasks = random_grouped_tasks(size, 10, seed=rng)
+    return lambda: decay_grouped_tasks_to_2_machines(grouped_tasks)
+
+
+@microbenchmark('load_file')
+def _load_file(size, rng, directory):
+    grouped_tasks = random_grouped_tasks(size, 20, seed=rng)
+    filename = os.path.join(directory, f'data{size}.txt')
+    with open(filename, 'w') as file:
+        file.write(f'{size} 20\n')
+        for row in grouped_tasks.matrix.astype(int).tolist():
+            file.write(' '.join(str(value) for value in row) + '\n')
+    return lambda: load_file(filename)
+
+
+@dataclass
+class MicroResult:
+    name: str
+    size: int
+    # nanoseconds per call, best and median of repeats
+    best_ns: float
+    median_ns: float
+    commit: str = ''
+    timestamp: float = 0
+
+
+def run_microbenchmark(name, size, repeat=5, seed=0) -> MicroResult:
+    with tempfile.TemporaryDirectory() as directory:
+        function = _benchmarks[name](size, np.random.default_rng(seed), directory)
+        timer = timeit.Timer(function)
+        # loops so that one repeat takes at least 0.2 s
+        number, _ = timer.autorange()
+        samples = [sample / number * 1e9 for sample in timer.repeat(repeat, number)]
+    return MicroResult(name, size, min(samples), median(samples))
+
+
+def current_commit():
+    # short hash, '+' marks uncommitted changes
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class MicroResultsStore:
+    def __init__(self, path='.microbench.jsonl'):
+        self.path = path
+
+    def append(self, results: List[MicroResult]):
+        with open(self.path, 'a') as file:
+            for result in results:
+                file.write(json.dumps(asdict(result)) + '\n')
+
+    def load(self) -> List[MicroResult]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as file:
+            return [MicroResult(**json.loads(line)) for line in file if line.strip()]
+
+    def commits(self):
+        # in order of first appearance
+        return list(dict.fromkeys(result.commit for result in self.load()))
+
+    def latest(self, commit) -> Dict[tuple, MicroResult]:
+        # newest result of each (name, size) measured at commit
+        return {(result.name, result.size): result for result in self.load() if result.commit == commit}
+
+
+def run_microbenchmarks(names=None, sizes=(10, 100, 1000), repeat=5, verbose=True) -> List[MicroResult]:
+    commit, timestamp = current_commit(), time.time()
+    results = []
+
+    for name in names or benchmarks():
+        for size in sizes:
+            result = run_microbenchmark(name, size, repeat)
+            result.commit, result.timestamp = commit, timestamp
+            results.append(result)
+            if verbose:
+                print(f'{name} n={size}: {result.best_ns:.0f} ns')
+
+    return results
+
+
+def compare_commits(store: MicroResultsStore, base, head):
+    # rows (name, size, base ns, head ns, head / base) of best times
+    base_results, head_results = store.latest(base), store.latest(head)
+    rows = []
+    for key in sorted(base_results.keys() & head_results.keys()):
+        base_ns, head_ns = base_results[key].best_ns, head_results[key].best_ns
+        rows.append((*key, base_ns, head_ns, head_ns / base_ns))
+    return rows
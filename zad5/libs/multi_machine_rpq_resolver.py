@@ -0,0 +1,137 @@
+from typing import Iterable
+import heapq
+import math
+
+from .order import Order
+from .rpq_task import RPQTask
+from .helpers import get_c_max_rpq
+from .rpq_resolver import RPQResolver, SchrageLogNResolver, CarlierResolver, CarlierStrategy, CarlierBudget
+
+# P|r_j,q_j|C_max - identical parallel machines. Result order is Order holding
+# list of task_no lists, one per machine.
+
+
+def get_c_max_multi_rpq(queue, order: Order):
+    return max((get_c_max_rpq(queue, Order(machine_order)) for machine_order in order.order if len(machine_order) != 0), default=0)
+
+
+def multi_rpq_lower_bound(queue, machines_no):
+    # single task bound and energy bound: machines can't start before m smallest
+    # R and can't finish before m smallest Q, work in between is shared
+    single = max(task.R + task.P + task.Q for task in queue)
+
+    m = min(machines_no, len(queue))
+    R = sorted(task.R for task in queue)[:m]
+    Q = sorted(task.Q for task in queue)[:m]
+    energy = math.ceil((sum(R) + sum(task.P for task in queue) + sum(Q)) / machines_no)
+
+    return max(single, energy)
+
+
+class MultiMachineSchrageResolver(RPQResolver):
+    def __init__(self, machines_no=2, improve_iter=100, carlier_budget: CarlierBudget=None):
+        self.machines_no = machines_no
+        self.improve_iter = improve_iter
+        # budget of carlier polishing each machine in the end, None skips it
+        self.carlier_budget = carlier_budget
+
+    def __repr__(self):
+        return f'MultiMachineSchrageResolver(machines={self.machines_no}, improve_iter={self.improve_iter})'
+
+    def schedule(self, queue: list):
+        # event driven list scheduling: earliest free machine takes ready task
+        # with biggest Q, O(n log n + n log m)
+        n = len(queue)
+        by_r = sorted(range(n), key=lambda task_index: queue[task_index].R)
+        machines = [(0, machine) for machine in range(self.machines_no)]
+        ready = []
+        orders = [[] for _ in range(self.machines_no)]
+        cmax = 0
+        i = 0
+
+        while len(ready) != 0 or i < n:
+            free_time, machine = machines[0]
+
+            if len(ready) == 0 and queue[by_r[i]].R > free_time:
+                # skip some time
+                free_time = queue[by_r[i]].R
+
+            while i < n and queue[by_r[i]].R <= free_time:
+                task_index = by_r[i]
+                heapq.heappush(ready, (-queue[task_index].Q, task_index))
+                i += 1
+
+            _, task_index = heapq.heappop(ready)
+            task = queue[task_index]
+            orders[machine].append(task.task_no)
+
+            free_time += task.P
+            cmax = max(cmax, free_time + task.Q)
+            heapq.heapreplace(machines, (free_time, machine))
+
+        return orders, cmax
+
+    def _resequence(self, queue, task_nos):
+        if len(task_nos) == 0:
+            return [], 0
+        order, cmax = SchrageLogNResolver().resolve([queue[task_no] for task_no in task_nos])
+        return order.tolist(), cmax
+
+    def improve(self, queue, orders, lower_bound):
+        # move tasks away from critical machine while it helps, each machine
+        # is resequenced with schrage, stop when lower bound is reached
+        machine_c_max = [get_c_max_rpq(queue, Order(order)) if len(order) != 0 else 0 for order in orders]
+
+        for _ in range(self.improve_iter):
+            critical = max(range(self.machines_no), key=machine_c_max.__getitem__)
+            c_max = machine_c_max[critical]
+            if c_max <= lower_bound:
+                break
+
+            best_move, best_c_max = None, c_max
+            for task_no in orders[critical]:
+                from_order, from_c_max = self._resequence(queue, [t for t in orders[critical] if t != task_no])
+
+                for machine in range(self.machines_no):
+                    if machine == critical:
+                        continue
+                    to_order, to_c_max = self._resequence(queue, orders[machine] + [task_no])
+
+                    others = max((machine_c_max[other] for other in range(self.machines_no) if other not in (critical, machine)), default=0)
+                    move_c_max = max(from_c_max, to_c_max, others)
+                    if move_c_max < best_c_max:
+                        best_move = (machine, from_order, from_c_max, to_order, to_c_max)
+                        best_c_max = move_c_max
+
+            if best_move is None:
+                break
+
+            machine, orders[critical], machine_c_max[critical], orders[machine], machine_c_max[machine] = best_move
+
+        return orders
+
+    def resolve(self, queue: Iterable) -> Order:
+        queue = [*queue]
+        if len(queue) == 0:
+            return [Order([[] for _ in range(self.machines_no)]), 0]
+
+        lower_bound = multi_rpq_lower_bound(queue, self.machines_no)
+        orders, c_max = self.schedule(queue)
+
+        if c_max > lower_bound and self.improve_iter > 0:
+            orders = self.improve(queue, orders, lower_bound)
+
+        if self.carlier_budget is not None:
+            carlier = CarlierResolver(CarlierStrategy.BFS, SchrageLogNResolver, self.carlier_budget)
+            for machine, order in enumerate(orders):
+                if len(order) < 2:
+                    continue
+                # carlier needs queue indexed by position
+                sub_queue = [queue[task_no] for task_no in order]
+                sub_order, sub_c_max = carlier.resolve([
+                    RPQTask(task_no=i, R=task.R, P=task.P, Q=task.Q) for i, task in enumerate(sub_queue)])
+                if sub_c_max.val < get_c_max_rpq(queue, Order(order)):
+                    orders[machine] = [sub_queue[i].task_no for i in sub_order.order]
+
+        order = Order(orders)
+        return [order, get_c_max_multi_rpq(queue, order)]
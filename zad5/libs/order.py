@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from typing import Iterable, Tuple
 
+import numpy as np
+
 @dataclass
 class Order:
     order: Iterable
@@ -12,13 +14,111 @@ class Order:
         return self.order == other.order
 
     def __getitem__(self, idx):
-        if isinstance(idx, range):
-            print('hello')
         return self.order[idx]
 
-class NpOrder(Order):
+
+# polynomial hash sum((task_no + 1) * BASE^position) mod MODULO, terms fit in
+# int64 so hash of whole array is one vectorised pass
+_HASH_MODULO = (1 << 31) - 1
+_HASH_BASE = 1000003
+_hash_powers = np.ones(1, dtype=np.int64)
+
+
+def _powers(n):
+    global _hash_powers
+    if len(_hash_powers) < n:
+        powers = np.empty(max(n, 2 * len(_hash_powers)), dtype=np.int64)
+        powers[0] = 1
+        for i in range(1, len(powers)):
+            powers[i] = powers[i - 1] * _HASH_BASE % _HASH_MODULO
+        _hash_powers = powers
+    return _hash_powers
+
+
+class Permutation(Order):
+    # order of task numbers in contiguous int32 array. Hash is computed on
+    # first use and then kept up to date by swap, rotate and item assignment,
+    # writing into .order directly leaves it stale.
+    def __init__(self, order: Iterable=()):
+        self.order = np.ascontiguousarray(order, dtype=np.int32).reshape(-1)
+        self._hash = None
+
+    @staticmethod
+    def of(order) -> 'Permutation':
+        # free when order already is a Permutation
+        if isinstance(order, Permutation):
+            return order
+        if isinstance(order, Order):
+            order = order.order
+        return Permutation(order)
+
+    def copy(self) -> 'Permutation':
+        result = Permutation(self.order.copy())
+        result._hash = self._hash
+        return result
+
+    def view(self, start=0, stop=None) -> np.ndarray:
+        # read only slice sharing memory with permutation
+        result = self.order[start:stop]
+        result.flags.writeable = False
+        return result
+
+    def tolist(self):
+        return self.order.tolist()
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __repr__(self):
+        return f'Permutation({self.order.tolist()})'
+
+    def _range_hash(self, start, stop):
+        powers = _powers(len(self.order))
+        terms = (self.order[start:stop].astype(np.int64) + 1) * powers[start:stop] % _HASH_MODULO
+        return int(terms.sum()) % _HASH_MODULO
+
     def __hash__(self):
-        return hash(self.order.tostring())
+        if self._hash is None:
+            self._hash = self._range_hash(0, len(self.order))
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, (Order, list, tuple, np.ndarray)):
+            return NotImplemented
+        if not isinstance(other, Permutation):
+            other = Permutation.of(other)
+        if len(self.order) != len(other.order) or hash(self) != hash(other):
+            return False
+        return np.array_equal(self.order, other.order)
+
+    def __setitem__(self, idx, task_no):
+        if self._hash is not None:
+            powers = _powers(len(self.order))
+            self._hash = (self._hash + (int(task_no) - int(self.order[idx])) * int(powers[idx])) % _HASH_MODULO
+        self.order[idx] = task_no
+
+    def swap(self, idx_a, idx_b):
+        # O(1), hash changes only by terms of two positions
+        order = self.order
+        a, b = int(order[idx_a]), int(order[idx_b])
+        if self._hash is not None:
+            powers = _powers(len(order))
+            self._hash = (self._hash + (b - a) * (int(powers[idx_a]) - int(powers[idx_b]))) % _HASH_MODULO
+        order[idx_a], order[idx_b] = b, a
+
+    def rotate(self, start, stop, shift):
+        # rotate order[start:stop] by shift like np.roll, O(stop - start)
+        if stop - start < 2:
+            return
+        if self._hash is not None:
+            self._hash -= self._range_hash(start, stop)
+        self.order[start:stop] = np.roll(self.order[start:stop], shift)
+        if self._hash is not None:
+            self._hash = (self._hash + self._range_hash(start, stop)) % _HASH_MODULO
+
 
-    def __eq__(self, val):
-        return (self.order == val.order).all()
+# former ndarray order, kept for old code
+NpOrder = Permutation
@@ -5,39 +5,70 @@ from collections import deque
 from typing import Tuple
 from time import time
 
-import numpy as np
 from numpy.core.fromnumeric import _swapaxes_dispatcher
 
-from .order import NpOrder, Order
+from .order import Order, Permutation
 from .grouped_tasks import GroupedTasks
 from .helpers import (get_c_max, pick_min, decay_grouped_tasks_to_2_machines, get_sorted_task_order,
     task_processing_time_on_all_machines, get_partial_c_max)
+from .solution_cache import cached_resolve
 
 
 
 
 class Resolver:
+    # deterministic resolvers give the same order for the same instance, so
+    # their results may be cached
+    deterministic = False
+
     def resolve(self, grouped_tasks: GroupedTasks) -> Order:
         raise RuntimeError("Resolver::resolve(...): method not implemented")
 
 
+def get_lower_bound(lower_bound, grouped_tasks: GroupedTasks):
+    # lower_bound is None, a number or function of grouped tasks like
+    # flowshop_bounds.flowshop_lower_bound
+    if lower_bound is None:
+        return -float('inf')
+    if callable(lower_bound):
+        return lower_bound(grouped_tasks)
+    return lower_bound
+
+
 class BruteForceResolver(Resolver):
+    deterministic = True
+
+    def __init__(self, lower_bound=None):
+        # search stops when order reaches lower bound
+        self.lower_bound = lower_bound
+
+    def __repr__(self) -> str:
+        if self.lower_bound is None:
+            return 'BruteForceResolver'
+        return f'BruteForceResolver(lower_bound={getattr(self.lower_bound, "__name__", self.lower_bound)})'
+
     def resolve(self, grouped_tasks: GroupedTasks) -> Order:
         order = tuple(i for i in range(grouped_tasks.tasks_no()))
+        lower_bound = get_lower_bound(self.lower_bound, grouped_tasks)
 
         best_order = order
         best_c_max = get_c_max(grouped_tasks, Order(order))
 
         for p in permutations(order):
+            if best_c_max <= lower_bound:
+                break
+
             c_max = get_c_max(grouped_tasks, Order(p))
             if c_max < best_c_max:
                 best_c_max = c_max
                 best_order = p
 
-        return Order(best_order)
+        return Permutation(best_order)
 
 
 class JohnsonResolver(Resolver):
+    deterministic = True
+
     def __repr__(self) -> str:
         return 'JohnsonResolver'
 
@@ -57,10 +88,12 @@ class JohnsonResolver(Resolver):
             else:
                 l2.appendleft(min_task_and_machine[0])
 
-        return Order(tuple(chain(l1, l2)))
+        return Permutation(tuple(chain(l1, l2)))
 
 
 class NehResolver(Resolver):
+    deterministic = True
+
     def __repr__(self):
         return 'NehResolver'
 
@@ -97,7 +130,7 @@ class NehResolver(Resolver):
             current_order.order.pop()
             current_order.order.insert(best_order_for_index, order.order[task])
 
-        return current_order
+        return Permutation(current_order.order)
 
 
 class DecisionGenerator:
@@ -118,11 +151,10 @@ class SwapDecisionGenerator(DecisionGenerator):
             self.idx_a = idx_a
             self.idx_b = idx_b
 
-        def apply(self, order: Order):
-            f = order.order
-            f[self.idx_a], f[self.idx_b] = f[self.idx_b], f[self.idx_a]
+        def apply(self, order: Permutation):
+            order.swap(self.idx_a, self.idx_b)
 
-        def revert(self, order: Order):
+        def revert(self, order: Permutation):
             self.apply(order)
 
     def random_decision(self, order: Order):
@@ -145,13 +177,11 @@ class InsertDecisionGenerator(DecisionGenerator):
             self.idx_from = idx_from
             self.idx_to = idx_to
 
-        def apply(self, order: Order):
-            f = order.order
-            f[self.idx_from:self.idx_to] = np.roll(f[self.idx_from:self.idx_to], -1)
+        def apply(self, order: Permutation):
+            order.rotate(self.idx_from, self.idx_to, -1)
 
-        def revert(self, order: Order):
-            f = order.order
-            f[self.idx_from:self.idx_to] = np.roll(f[self.idx_from:self.idx_to], 1)
+        def revert(self, order: Permutation):
+            order.rotate(self.idx_from, self.idx_to, 1)
 
     def random_decision(self, order: Order):
         return self.InsertDecision(*self._gen_idx(len(order.order) - 1))
@@ -215,12 +245,18 @@ class TsResolver(Resolver):
             first_order: Resolver=JohnsonResolver(),
             decision_generator: DecisionGenerator=SwapDecisionGenerator(),
             tabu_list_length=10,
-            stop_option: StopOption=TimeStopOption(60)):
+            stop_option: StopOption=TimeStopOption(60),
+            lower_bound=None,
+            instrumentation=None):
         self.neighbours_max = neighbours_max
         self.first_order = first_order
         self.stop_option = stop_option
         self.decision_generator = decision_generator
         self.tabu_list_length = tabu_list_length
+        # search stops early when best order reaches lower bound
+        self.lower_bound = lower_bound
+        # Instrumentation or None
+        self.instrumentation = instrumentation
 
     def __repr__(self):
         return f'TsResolver:neighbours={self.neighbours_max}:first_order={self.first_order}:{self.decision_generator}:tabu_list_length={self.tabu_list_length}:stop_option={self.stop_option}'
@@ -239,6 +275,14 @@ class TsResolver(Resolver):
             # revert to original order
             decision.revert(order)
 
+    def _instrumented_order_decisions(self, current, tabu_list, instrumentation):
+        for order, decision in self.gen_order_decision(current):
+            if order in tabu_list:
+                instrumentation.count('tabu_hits')
+                continue
+            instrumentation.count('evaluations')
+            yield (order, decision)
+
     class TabuList:
         def __init__(self, max_size):
             self.max_size = max_size
@@ -249,6 +293,12 @@ class TsResolver(Resolver):
             return obj in self.tabu_set
 
         def add(self, obj):
+            if obj in self.tabu_set:
+                # refresh, it becomes the newest one
+                self.tabu_history.remove(obj)
+                self.tabu_history.append(obj)
+                return
+
             if len(self.tabu_history) >= self.max_size:
                 self.tabu_set.remove(self.tabu_history[0])
                 self.tabu_history.popleft()
@@ -257,16 +307,25 @@ class TsResolver(Resolver):
             self.tabu_set.add(obj)
 
     def resolve(self, grouped_tasks: GroupedTasks) -> Order:
-        current = self.first_order.resolve(grouped_tasks)
-        current = NpOrder(np.array(current.order))
-        best = NpOrder(np.copy(current.order))
+        # deterministic first orders come from solution cache
+        current = Permutation.of(cached_resolve(self.first_order, grouped_tasks)).copy()
+        best = current.copy()
         best_c_max = get_c_max(grouped_tasks, best)
+        lower_bound = get_lower_bound(self.lower_bound, grouped_tasks)
 
         tabu_list = self.TabuList(self.tabu_list_length)
         self.stop_option.start()
 
-        while not self.stop_option.should_stop():
-            order_decisions = ((order, swap_decision) for order, swap_decision in self.gen_order_decision(current) if order not in tabu_list)
+        instrumentation = self.instrumentation
+        iteration = 0
+        if instrumentation is not None:
+            instrumentation.start()
+
+        while not self.stop_option.should_stop() and best_c_max > lower_bound:
+            if instrumentation is None:
+                order_decisions = ((order, swap_decision) for order, swap_decision in self.gen_order_decision(current) if order not in tabu_list)
+            else:
+                order_decisions = self._instrumented_order_decisions(current, tabu_list, instrumentation)
 
             # order is dynamically changed current
             _, decision = min(order_decisions, default=(None, None), key=lambda order_and_decision: get_c_max(grouped_tasks, order_and_decision[0]))
@@ -277,15 +336,18 @@ class TsResolver(Resolver):
             # generate min order in current
             decision.apply(current)
 
-            # add to tabu list
-            not_writeable_copy = np.copy(current.order)
-            not_writeable_copy.flags.writeable = False
-            tabu_list.add(NpOrder(not_writeable_copy))
+            # add to tabu list, copy keeps cached hash
+            tabu_list.add(current.copy())
 
             current_c_max = get_c_max(grouped_tasks, current)
             if current_c_max < best_c_max:
                 best_c_max = current_c_max
-                best = NpOrder(np.copy(current.order))
+                best = current.copy()
+
+            if instrumentation is not None:
+                instrumentation.count('accepted_moves')
+                instrumentation.sample(iteration, current_c_max, best_c_max)
+            iteration += 1
 
             self.stop_option.next_iter()
 
@@ -0,0 +1,116 @@
+from typing import Iterable
+import heapq
+import multiprocessing
+import os
+
+import numpy as np
+
+from .rpq_resolver import preemptive_schrage_lists
+from .shared_instances import SharedInstanceStore, attach
+
+# Schrage over many RPQ instances in one call. Instances are arrays of shape
+# (n, 3) with R, P, Q columns, either stacked in one (k, n, 3) array or given
+# as ragged list. Small batches are solved in a tight loop over plain lists,
+# big ones are split between worker processes, which read instances from
+# shared memory.
+
+
+def rpq_queue_to_array(queue: Iterable) -> np.ndarray:
+    return np.array([(task.R, task.P, task.Q) for task in queue], dtype=np.int64).reshape(-1, 3)
+
+
+def schrage_lists(R, P, Q):
+    # non preemptive schrage, heap holds ints encoding (Q, index)
+    n = len(R)
+    by_r = sorted(range(n), key=R.__getitem__)
+    q_max = max(Q)
+
+    G = []
+    i = 0
+    t = R[by_r[0]]
+
+    order = []
+    cmax = 0
+
+    while len(G) != 0 or i < n:
+        while i < n and R[by_r[i]] <= t:
+            task_index = by_r[i]
+            heapq.heappush(G, (q_max - Q[task_index]) * n + task_index)
+            i += 1
+
+        if len(G) == 0:
+            # skip some time
+            t = R[by_r[i]]
+            continue
+
+        task_index = heapq.heappop(G) % n
+        order.append(task_index)
+        t += P[task_index]
+
+        cmax = max(cmax, t + Q[task_index])
+
+    return order, cmax
+
+
+def _solve_shared_chunk(args):
+    # instances are concatenated in one shared array, offsets mark their ends
+    tasks_handle, offsets_handle, instance_indices, preemptive = args
+    tasks, offsets = attach(tasks_handle), attach(offsets_handle)
+    instances = [tasks[offsets[i]:offsets[i + 1]] for i in instance_indices]
+    return _solve_chunk((instances, preemptive))
+
+
+def _solve_chunk(args):
+    instances, preemptive = args
+    result = []
+
+    for instance in instances:
+        if len(instance) == 0:
+            result.append(([], 0))
+            continue
+
+        R, P, Q = (column.tolist() for column in np.asarray(instance).T)
+        if preemptive:
+            result.append(preemptive_schrage_lists(R, P, Q, range(len(R))))
+        else:
+            result.append(schrage_lists(R, P, Q))
+
+    return result
+
+
+def schrage_batch(instances, preemptive=False, processes=None, parallel_threshold=200000):
+    # returns (c_max array, orders), orders is (k, n) array for stacked input
+    # and list of arrays for ragged one. Preemptive orders list pieces,
+    # so they may be longer than n.
+    stacked = isinstance(instances, np.ndarray) and instances.ndim == 3
+    instances = list(instances)
+    tasks_no = sum(len(instance) for instance in instances)
+
+    processes = processes or os.cpu_count()
+    if tasks_no < parallel_threshold or processes == 1 or len(instances) < 2:
+        results = _solve_chunk((instances, preemptive))
+    else:
+        # few chunks per process evens out different instance sizes
+        chunks_no = min(len(instances), processes * 4)
+        offsets = np.cumsum([0] + [len(instance) for instance in instances], dtype=np.int64)
+        tasks = np.concatenate([np.asarray(instance, dtype=np.int64).reshape(-1, 3) for instance in instances])
+
+        with SharedInstanceStore() as store:
+            tasks_handle, offsets_handle = store.publish(tasks), store.publish(offsets)
+            chunks = [(tasks_handle, offsets_handle, range(i, len(instances), chunks_no), preemptive) for i in range(chunks_no)]
+
+            with multiprocessing.Pool(processes) as pool:
+                chunk_results = pool.map(_solve_shared_chunk, chunks)
+
+        # undo the round robin split
+        results = [None] * len(instances)
+        for i, chunk_result in enumerate(chunk_results):
+            results[i::chunks_no] = chunk_result
+
+    c_max = np.array([cmax for _, cmax in results], dtype=np.int64)
+    if stacked and not preemptive:
+        orders = np.array([order for order, _ in results], dtype=np.int32)
+    else:
+        orders = [np.array(order, dtype=np.int32) for order, _ in results]
+
+    return c_max, orders
@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from statistics import median, quantiles
+from time import perf_counter
+from typing import Callable, Dict, List
+import tracemalloc
+
+import numpy as np
+
+from .generators import random_rpq_queue
+from .rpq_resolver import (SchrageN2Resolver, SchrageLogNResolver, CarlierResolver, CarlierStrategy,
+    CarlierBudget)
+
+# Scaling of RPQ resolvers over instance size. Every (resolver, size) pair is
+# timed on seeded random instances, Carlier also reports searched nodes and
+# schrage calls. Peak memory is taken in separate run under tracemalloc, so it
+# does not distort times. Empirical complexity is slope of log time over
+# log size.
+
+
+@dataclass
+class RPQBenchmarkEntry:
+    name: str
+    # queue -> dict of extra metrics, queue may be changed by it
+    run: Callable
+
+
+def _schrage(resolver, preemptive):
+    def run(queue):
+        if preemptive:
+            resolver.pmtn_resolve(queue)
+        else:
+            resolver.resolve(queue)
+        return {'schrage_calls': 1}
+    return run
+
+
+def _carlier(strategy, budget):
+    def run(queue):
+        stats = CarlierResolver(strategy, SchrageLogNResolver, budget).solve(queue).stats
+        return {'nodes': stats.expanded, 'schrage_calls': stats.schrage_calls}
+    return run
+
+
+def default_entries(carlier_budget=CarlierBudget(max_nodes=2000)) -> List[RPQBenchmarkEntry]:
+    return [
+        RPQBenchmarkEntry('SchrageN2', _schrage(SchrageN2Resolver(), False)),
+        RPQBenchmarkEntry('SchrageN2 pmtn', _schrage(SchrageN2Resolver(), True)),
+        RPQBenchmarkEntry('SchrageLogN', _schrage(SchrageLogNResolver(), False)),
+        RPQBenchmarkEntry('SchrageLogN pmtn', _schrage(SchrageLogNResolver(), True)),
+        RPQBenchmarkEntry('Carlier BFS', _carlier(CarlierStrategy.BFS, carlier_budget)),
+        RPQBenchmarkEntry('Carlier Normal', _carlier(CarlierStrategy.Normal, carlier_budget)),
+    ]
+
+
+@dataclass
+class RPQBenchmarkResult:
+    name: str
+    size: int
+    # seconds
+    times: List[float] = field(default_factory=list)
+    metrics: Dict[str, List[int]] = field(default_factory=dict)
+    # bytes
+    peak_memory: int = 0
+
+    def median_time(self):
+        return median(self.times)
+
+    def iqr_time(self):
+        if len(self.times) < 2:
+            return 0.0
+        q1, _, q3 = quantiles(self.times, n=4)
+        return q3 - q1
+
+    def median_metric(self, metric):
+        return median(self.metrics[metric]) if metric in self.metrics else None
+
+
+def fit_exponent(sizes, times):
+    # time ~ c * n^k, k from least squares on logs
+    sizes, times = np.asarray(sizes, dtype=float), np.asarray(times, dtype=float)
+    usable = times > 0
+    if usable.sum() < 2:
+        return None
+    slope, _ = np.polyfit(np.log(sizes[usable]), np.log(times[usable]), 1)
+    return float(slope)
+
+
+def run_rpq_benchmark(entries, sizes=(10, 20, 50, 100, 200, 500), repetitions=5,
+        min_value=1, max_value=2000, seed=0, verbose=True) -> Dict[str, List[RPQBenchmarkResult]]:
+    results = {entry.name: [] for entry in entries}
+
+    for size in sizes:
+        instances = [random_rpq_queue(size, min_value, max_value, seed=seed + repetition) for repetition in range(repetitions)]
+
+        for entry in entries:
+            result = RPQBenchmarkResult(entry.name, size)
+            for queue in instances:
+                start = perf_counter()
+                metrics = entry.run([*queue])
+                result.times.append(perf_counter() - start)
+                for metric, value in metrics.items():
+                    result.metrics.setdefault(metric, []).append(value)
+
+            tracemalloc.start()
+            entry.run([*instances[0]])
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[entry.name].append(result)
+            if verbose:
+                print(f'Done: {size}--{entry.name}: {result.median_time() * 1000:.3f} ms')
+
+    return results
+
+
+def exponents(results: Dict[str, List[RPQBenchmarkResult]]) -> Dict[str, float]:
+    return {
+        name: fit_exponent([result.size for result in entry_results], [result.median_time() for result in entry_results])
+        for name, entry_results in results.items()}
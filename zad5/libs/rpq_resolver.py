@@ -1,15 +1,26 @@
 from collections import deque
 from os import sched_rr_get_interval
 from libs.helpers import get_c_max_rpq
-from .order import Order
+from .order import Order, Permutation
 from .rpq_task import RPQTask
 import numpy as np
 from typing import Iterable, Tuple
 from .priority_queue import PriorityQueue
-from .int_ptr import IntPtr
+from .int_ptr import IntPtr, SharedIntPtr
+from .lru_cache import LRUCache
+from .resolver import StopOption, TimeStopOption, TsResolver
+from .shared_instances import SharedInstanceStore, attach
 import math
 from queue import Queue as Queue_synchronized
 from copy import deepcopy
+from dataclasses import dataclass
+import heapq
+import multiprocessing
+import os
+import resource
+import random
+import sys
+from time import perf_counter
 
 class RPQResolver:
     def resolve(self, queue: Iterable) -> Order:
@@ -46,7 +57,7 @@ class SchrageN2Resolver(RPQResolver):
                 cmax = max(cmax, t + task.Q)
 
 
-        return [Order(order), cmax]
+        return [Permutation(order), cmax]
 
     def pmtn_resolve(self, queue: list) -> Order:
         task_on_machine = None
@@ -117,47 +128,189 @@ class SchrageLogNResolver(RPQResolver):
                 cmax = max(cmax, t + task.Q)
 
 
-        return [Order(order), cmax]
-
-    def pmtn_resolve(self, queue: list) -> Order:
-        task_on_machine = None
+        return [Permutation(order), cmax]
+
+    def pmtn_resolve(self, queue: list, segments: list = None) -> Order:
+        return preemptive_schrage(queue, segments)
+
+
+# Jackson's preemptive schedule. Remaining processing times are kept in a list
+# and the ready heap holds plain ints encoding (Q, index), so preempting a task
+# allocates nothing. Each arrival causes at most one extra push, O(n log n).
+# If segments list is given, (task_no, start, end) of every piece is appended.
+def preemptive_schrage(queue: list, segments: list = None):
+    if len(queue) == 0:
+        return [Order([]), 0]
+
+    order, cmax = preemptive_schrage_lists(
+        [task.R for task in queue],
+        [task.P for task in queue],
+        [task.Q for task in queue],
+        [task.task_no for task in queue],
+        segments)
+
+    return [Order(order), cmax]
+
+# same as above on plain R, P, Q lists, task_nos are used in order and segments
+def preemptive_schrage_lists(R, P, Q, task_nos, segments: list = None):
+    n = len(R)
+    remaining = list(P)
+    by_r = sorted(range(n), key=R.__getitem__)
+    q_max = max(Q)
+
+    G = []
+    i = 0
+    t = R[by_r[0]]
+
+    order = []
+    cmax = 0
+
+    while len(G) != 0 or i < n:
+        while i < n and R[by_r[i]] <= t:
+            task_index = by_r[i]
+            heapq.heappush(G, (q_max - Q[task_index]) * n + task_index)
+            i += 1
+
+        if len(G) == 0:
+            # skip some time
+            t = R[by_r[i]]
+            continue
+
+        key = heapq.heappop(G)
+        task_index = key % n
+        task_no = task_nos[task_index]
+        start = t
+
+        # run task until it is done or until next arrival, which may preempt it
+        next_r = R[by_r[i]] if i < n else math.inf
+        if t + remaining[task_index] <= next_r:
+            t += remaining[task_index]
+            remaining[task_index] = 0
+            cmax = max(cmax, t + Q[task_index])
+        else:
+            remaining[task_index] -= next_r - t
+            t = next_r
+            heapq.heappush(G, key)
+
+        if len(order) == 0 or order[-1] != task_no:
+            order.append(task_no)
+            if segments is not None:
+                segments.append((task_no, start, t))
+        elif segments is not None:
+            # task continues running after an arrival that didn't preempt it
+            segments[-1] = (task_no, segments[-1][1], t)
+
+    return order, cmax
+
+
+# Schrage on bucket queues indexed by R and Q values, O(n log_64 C + C) where
+# C is the range of R and Q. Ready tasks are kept in per Q buckets, non empty
+# buckets are marked in 64-ary tree of bitmaps: bit of a word in level k + 1
+# is set when word below it in level k is not zero. Words fit in machine
+# word, so push, pop and finding highest Q touch one small int per level.
+# Falls back to heap based SchrageLogNResolver if the range is too wide.
+class SchrageBucketResolver(RPQResolver):
+    def __init__(self, max_range=None):
+        self.max_range = max_range
+
+    def _range_limit(self, n):
+        if self.max_range is not None:
+            return self.max_range
+        # measured against SchrageLogNResolver for n from 10^4 to 2 * 10^5:
+        # range 2n takes 0.4 of heap time, 7n 0.8, 16n already 2 times more,
+        # allocating and scanning buckets costs more than heap operations
+        return 8 * n
 
-        G = PriorityQueue(compare = lambda task1, task2:  task1.Q >= task2.Q )
-        N = PriorityQueue(compare = lambda task1, task2:  task1.R <= task2.R )
-        for task in queue:
-            N.push(task)
+    @staticmethod
+    def _bitmap_levels(size):
+        # levels[0] marks buckets, last level is a single word
+        levels = []
+        while True:
+            size = (size + 63) >> 6
+            levels.append([0] * size)
+            if size == 1:
+                return levels
 
-        t = 0
+    def resolve(self, queue: list) -> Order:
+        n = len(queue)
+        if n == 0:
+            return [Permutation([]), 0]
+
+        R = [task.R for task in queue]
+        Q = [task.Q for task in queue]
+        r_min, q_min = min(R), min(Q)
+        r_range = max(R) - r_min + 1
+        q_range = max(Q) - q_min + 1
+
+        range_limit = self._range_limit(n)
+        if r_range > range_limit or q_range > range_limit:
+            return SchrageLogNResolver().resolve(queue)
+
+        # counting sort by R
+        r_buckets = [[] for _ in range(r_range)]
+        for task_index in range(n):
+            r_buckets[R[task_index] - r_min].append(task_index)
+        by_r = [task_index for bucket in r_buckets for task_index in bucket]
+
+        q_buckets = [[] for _ in range(q_range)]
+        levels = self._bitmap_levels(q_range)
+        top = levels[-1]
+        ready_no = 0
+
+        i = 0
+        t = R[by_r[0]]
 
         order = []
         cmax = 0
 
-        while G.len() != 0 or N.len() != 0:
-            while N.len() != 0 and N.peek().R <= t:
-                moved_task = N.pop()
-                G.push(moved_task)
+        while ready_no != 0 or i < n:
+            while i < n and R[by_r[i]] <= t:
+                task_index = by_r[i]
+                q = Q[task_index] - q_min
+                bucket = q_buckets[q]
+                if len(bucket) == 0:
+                    # mark up the tree until already marked word
+                    for level in levels:
+                        word = level[q >> 6]
+                        level[q >> 6] = word | (1 << (q & 63))
+                        if word != 0:
+                            break
+                        q >>= 6
+                bucket.append(task_index)
+                ready_no += 1
+                i += 1
+
+            if ready_no == 0:
+                # skip some time
+                t = R[by_r[i]]
+                continue
+
+            # highest set bit of each level from the top down
+            q = top[0].bit_length() - 1
+            for level in reversed(levels[:-1]):
+                q = (q << 6) | (level[q].bit_length() - 1)
+
+            bucket = q_buckets[q]
+            task_index = bucket.pop()
+            if len(bucket) == 0:
+                for level in levels:
+                    word = level[q >> 6] & ~(1 << (q & 63))
+                    level[q >> 6] = word
+                    if word != 0:
+                        break
+                    q >>= 6
+            ready_no -= 1
 
-                if task_on_machine is not None and moved_task.Q > task_on_machine.Q:
-                    task_on_machine = RPQTask(
-                        task_no = task_on_machine.task_no,
-                        R = task_on_machine.R,
-                        P = t - moved_task.R,
-                        Q = task_on_machine.Q)
-                    t = moved_task.R
-                    if task_on_machine.P > 0:
-                        G.push(task_on_machine)
+            task = queue[task_index]
+            order.append(task.task_no)
+            t += task.P
 
-            if G.len() == 0:
-                t = N.peek().R
-            else:
-                task = G.pop()
-                task_on_machine = task
-                order.append(task.task_no)
-                t += task.P
+            cmax = max(cmax, t + task.Q)
 
-                cmax = max(cmax, t + task.Q)
+        return [Permutation(order), cmax]
 
-        return [Order(order), cmax]
+    def pmtn_resolve(self, queue: list, segments: list = None) -> Order:
+        return preemptive_schrage(queue, segments)
 
 from enum import Enum
 
@@ -166,38 +319,108 @@ class CarlierStrategy(Enum):
     BFS = 1
 
 class CarlierDoneException(Exception):
-    pass
+    def __init__(self, reason='no_interference_task'):
+        super().__init__(reason)
+        self.reason = reason
+
+def resident_memory() -> int:
+    # current resident set in bytes. Without /proc only peak of the whole
+    # process lifetime is known, ru_maxrss is bytes on macOS and KiB elsewhere
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# limits after which search is stopped, None means unlimited
+@dataclass
+class CarlierBudget:
+    max_nodes: int = None
+    # seconds
+    max_time: float = None
+    # bytes of current resident memory of the process running the search, for
+    # ParallelCarlierResolver it is the master process holding the frontier,
+    # workers are not counted
+    max_memory: int = None
+    # expanded nodes without upper bound improvement
+    max_stagnation: int = 1000
+
+@dataclass
+class CarlierStats:
+    generated: int = 0
+    pruned: int = 0
+    expanded: int = 0
+    schrage_calls: int = 0
+    pmtn_calls: int = 0
+    cache_hits: int = 0
+    # heads and tails tightened by elimination rules
+    eliminated: int = 0
+    # children skipped because same R/Q state was already generated
+    duplicates: int = 0
+    # seconds spent in schrage and in least bound computation
+    schrage_time: float = 0
+    bound_time: float = 0
+
+    def add(self, other):
+        for field in self.__dataclass_fields__:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+@dataclass
+class CarlierResult:
+    order: Order
+    c_max: int
+    lower_bound: int
+    proven_optimal: bool
+    # 'completed' or reason of CarlierDoneException
+    stop_reason: str
+    stats: CarlierStats
+
+# critical block found in schrage order: a..b is the critical path,
+# c the interference task and K = c+1..b with r, q, p as in r(K), q(K), p(K)
+@dataclass
+class CriticalBlock:
+    a: int
+    b: int
+    c: int
+    r: int
+    q: int
+    p: int
+
+    def h(self):
+        return self.r + self.q + self.p
+
+    def h_with(self, task: RPQTask):
+        # h(K + {task})
+        return min(self.r, task.R) + min(self.q, task.Q) + self.p + task.P
 
 class CarlierResolver(RPQResolver):
-    def __init__(self, strategy: CarlierStrategy, schrage):
+    def __init__(self, strategy: CarlierStrategy, schrage, budget: CarlierBudget=None, cache_size=4096, elimination=False, instrumentation=None):
         self.strategy = strategy
         self.schrage = schrage
-
-
-    def add_vertex(self, queue, upper_bound: IntPtr, pi_star: Order, least_bound: int):
-        if self.strategy == CarlierStrategy.Normal:
-            self._impl(queue, upper_bound, pi_star)
-        else:
-            self.tasks_from_recursion.append(((deepcopy(queue), least_bound)))
+        self.budget = budget if budget is not None else CarlierBudget()
+        self.cache_size = cache_size
+        self.elimination = elimination
+        # Instrumentation or None, samples node schrage c_max and upper bound
+        self.instrumentation = instrumentation
 
     @staticmethod
-    def _find_a(order, queue, c_max, b_order_index):
-        b_task = queue[order[b_order_index]]
-
-        for order_index, task_index in enumerate(order.order):
-            task = queue[task_index]
-            if task.R + sum(queue[order[s]].P for s in range(order_index, b_order_index + 1)) + b_task.Q == c_max:
-                return order_index
-
-        raise RuntimeError('a not found')
+    def _node_key(queue):
+        # only R and Q are modified by branching, P and task order stay the same
+        return tuple([task.R for task in queue] + [task.Q for task in queue])
 
     @staticmethod
-    def _find_b(order, queue, c_max):
+    def _find_critical_path(order, queue, c_max) -> CriticalBlock:
+        tasks = [queue[task_index] for task_index in order.order]
+
+        # prefix[i] -> sum of P of first i tasks in order
+        prefix = [0] * (len(tasks) + 1)
         t = 0
         b_order_index = None
 
-        for order_index, task_index in enumerate(order.order):
-            task = queue[task_index]
+        for order_index, task in enumerate(tasks):
+            prefix[order_index + 1] = prefix[order_index] + task.P
             if task.R > t:
                 t = task.R
             t += task.P
@@ -205,143 +428,647 @@ class CarlierResolver(RPQResolver):
                 b_order_index = order_index
 
         assert b_order_index is not None
-        return b_order_index
-
-    @staticmethod
-    def _find_a_b(order, queue, c_max):
-        t = 0
-        a_order_index, b_order_index = None, None
+        b_task = tasks[b_order_index]
 
-        for order_index, task_index in enumerate(order.order):
-            task = queue[task_index]
-            if task.R > t:
+        # a is first task for which R_a + P_a + ... + P_b + Q_b == c_max
+        a_order_index = None
+        a_key = c_max - b_task.Q - prefix[b_order_index + 1]
+        for order_index in range(b_order_index + 1):
+            if tasks[order_index].R - prefix[order_index] == a_key:
                 a_order_index = order_index
-                t = task.R
-            t += task.P
-            if t + task.Q == c_max:
-                b_order_index = order_index
+                break
 
-        return a_order_index, b_order_index
+        if a_order_index is None:
+            raise RuntimeError('a not found')
 
-    @staticmethod
-    def _find_c(order, queue, a_order_index, b_order_index):
+        # c is last task in block a..b with Q < Q_b, gather r and q of K on the way
         c_order_index = None
-        b_task = queue[order[b_order_index]]
-
-        for order_index in range(a_order_index, b_order_index + 1):
-            task = queue[order[order_index]]
+        r_k, q_k = math.inf, math.inf
+        for order_index in range(b_order_index, a_order_index - 1, -1):
+            task = tasks[order_index]
             if task.Q < b_task.Q:
                 c_order_index = order_index
+                break
+            r_k = min(r_k, task.R)
+            q_k = min(q_k, task.Q)
 
-        return c_order_index
+        if c_order_index is None:
+            return CriticalBlock(a_order_index, b_order_index, None, r_k, q_k, 0)
+
+        return CriticalBlock(
+            a_order_index,
+            b_order_index,
+            c_order_index,
+            r_k,
+            q_k,
+            prefix[b_order_index + 1] - prefix[c_order_index + 1])
+
+    def _update_upper_bound(self, order: Order, c_max, upper_bound: IntPtr, pi_star: Order) -> bool:
+        if c_max < upper_bound.val:
+            upper_bound.val = c_max
+            pi_star.order = deepcopy(order.order)
+            return True
+        return False
+
+    def _check_budget(self):
+        budget = self.budget
+
+        # root is always expanded so that there is some schedule to return
+        if self.stats.expanded == 0:
+            return
+
+        if budget.max_nodes is not None and self.stats.expanded >= budget.max_nodes:
+            raise CarlierDoneException('max_nodes')
+
+        if budget.max_time is not None and perf_counter() - self.start_time > budget.max_time:
+            raise CarlierDoneException('max_time')
+
+        # reading memory is a syscall, don't ask on every node
+        if budget.max_memory is not None and self.stats.expanded >= self.next_memory_check:
+            self.next_memory_check = self.stats.expanded + 64
+            if resident_memory() > budget.max_memory:
+                raise CarlierDoneException('max_memory')
+
+    def _schrage(self, queue):
+        start = perf_counter()
+        key = CarlierResolver._node_key(queue)
+        result = self.schrage_cache.get(key)
+
+        if result is None:
+            result = self.schrage().resolve([*queue])
+            self.schrage_cache.put(key, result)
+            self.stats.schrage_calls += 1
+        else:
+            self.stats.cache_hits += 1
 
-    @staticmethod
-    def r_func(K, queue, order):
-        r_times = (queue[order[k]].R for k in K)
-        return min(r_times)
+        self.stats.schrage_time += perf_counter() - start
+        return result
 
-    @staticmethod
-    def q_func(K, queue, order):
-        q_times = (queue[order[k]].Q for k in K)
-        return min(q_times)
+    def _least_bound(self, queue, block: CriticalBlock = None, c_task: RPQTask = None, key=None):
+        start = perf_counter()
+        if key is None:
+            key = CarlierResolver._node_key(queue)
+        least_bound_c_max = self.pmtn_cache.get(key)
 
-    @staticmethod
-    def p_func(K, queue, order):
-        p_times = (queue[order[k]].P for k in K)
-        return sum(p_times)
+        if least_bound_c_max is None:
+            _, least_bound_c_max = self.schrage().pmtn_resolve([*queue])
+            self.pmtn_cache.put(key, least_bound_c_max)
+            self.stats.pmtn_calls += 1
+        else:
+            self.stats.cache_hits += 1
 
-    @staticmethod
-    def h_func(K, queue, order):
-        return (
-            CarlierResolver.r_func(K, queue, order)
-            + CarlierResolver.q_func(K, queue, order)
-            + CarlierResolver.p_func(K, queue, order))
-
-    def _impl(self, queue: Iterable, upper_bound: IntPtr, pi_star: Order) -> Order:
-        u_order, u_cmax = self.schrage().resolve([*queue])
-
-        if u_cmax < upper_bound.val:
-            upper_bound.val = u_cmax
-            pi_star.order = deepcopy(u_order.order)
+        if block is not None:
+            least_bound_c_max = max(least_bound_c_max, block.h(), block.h_with(c_task))
+        self.stats.bound_time += perf_counter() - start
+        return least_bound_c_max
+
+    def _expand(self, queue, upper_bound: IntPtr, pi_star: Order):
+        self._check_budget()
+        self.stats.expanded += 1
+        u_order, u_cmax = self._schrage(queue)
+
+        if self._update_upper_bound(u_order, u_cmax, upper_bound, pi_star):
             self.current_cmax_iter = 0
         else:
             self.current_cmax_iter += 1
 
-        if self.current_cmax_iter > self.max_iter:
-            raise CarlierDoneException()
+        if self.instrumentation is not None:
+            self.instrumentation.sample(self.stats.expanded, u_cmax, upper_bound.val)
 
-        b_order_index = CarlierResolver._find_b(u_order, queue, u_cmax)
-        a_order_index = CarlierResolver._find_a(u_order, queue, u_cmax, b_order_index)
-        #a_order_index, b_order_index = CarlierResolver._find_a_b(u_order, queue, u_cmax)
-        if a_order_index is None or b_order_index is None:
-            raise CarlierDoneException()
+        if self.budget.max_stagnation is not None and self.current_cmax_iter > self.budget.max_stagnation:
+            raise CarlierDoneException('max_stagnation')
 
-        c_order_index = CarlierResolver._find_c(u_order, queue, a_order_index, b_order_index)
-        if c_order_index is None:
+        block = CarlierResolver._find_critical_path(u_order, queue, u_cmax)
+        if block.c is None:
             raise CarlierDoneException()
 
-        K = [*range(c_order_index+1, b_order_index+1)]
+        eliminated = []
+        if self.elimination:
+            eliminated = self._eliminate(queue, u_order, block, upper_bound)
+            if eliminated is None:
+                self.stats.pruned += 1
+                return None
+
+        return u_order[block.c], block, eliminated
+
+    def _eliminate(self, queue, order, block: CriticalBlock, upper_bound: IntPtr):
+        # Carlier's elimination rules: task j outside of K with p_j > UB - h(K)
+        # can't be inside K in a schedule better than UB, so it goes either
+        # before whole K (tail is increased) or after it (head is increased).
+        # Changed tasks are returned as (index, original task) for restoring,
+        # None if j fits on neither side and node can't improve UB.
+        upper_bound_val = upper_bound.val
+        threshold = upper_bound_val - block.h()
+        in_k = set(order.order[block.c + 1:block.b + 1])
+        eliminated = []
+
+        for task_index, task in enumerate(queue):
+            if task.P <= threshold or task_index in in_k:
+                continue
+
+            R, Q = task.R, task.Q
+            not_before = task.R + task.P + block.p + block.q >= upper_bound_val
+            not_after = block.r + block.p + task.P + task.Q >= upper_bound_val
+
+            if not_before and not_after:
+                CarlierResolver._restore(queue, eliminated)
+                return None
+            if not_before:
+                R = max(R, block.r + block.p)
+            if not_after:
+                Q = max(Q, block.q + block.p)
+
+            if R != task.R or Q != task.Q:
+                eliminated.append((task_index, task))
+                queue[task_index] = RPQTask(task_no=task.task_no, R=R, P=task.P, Q=Q)
+
+        self.stats.eliminated += len(eliminated)
+        return eliminated
 
-        self._recursion_on_r(queue, u_order, c_order_index, K, upper_bound, pi_star)
-        self._recursion_on_q(queue, u_order, c_order_index, K, upper_bound, pi_star)
+    @staticmethod
+    def _restore(queue, eliminated):
+        for task_index, task in reversed(eliminated):
+            queue[task_index] = task
+
+    def _branch(self, queue, c_task_index, c_task: RPQTask, block: CriticalBlock, on_r, upper_bound: IntPtr):
+        # puts branched c task into queue, caller restores it afterwards,
+        # returns least bound of child or None if child is not worth exploring
+        if on_r:
+            queue[c_task_index] = RPQTask(
+                task_no = c_task.task_no,
+                R = max(c_task.R, block.r + block.p),
+                P = c_task.P,
+                Q = c_task.Q
+            )
+        else:
+            queue[c_task_index] = RPQTask(
+                task_no = c_task.task_no,
+                R = c_task.R,
+                P = c_task.P,
+                Q = max(c_task.Q, block.q + block.p)
+            )
+
+        key = CarlierResolver._node_key(queue)
+        least_bound_c_max = self._least_bound(queue, block, queue[c_task_index], key)
+
+        if least_bound_c_max >= upper_bound.val:
+            self.stats.pruned += 1
+            return None
+
+        # hash only, keeping full keys of every generated node is too much memory
+        key_hash = hash(key)
+        if key_hash in self.generated_nodes:
+            self.stats.duplicates += 1
+            return None
+        self.generated_nodes.add(key_hash)
+
+        self.stats.generated += 1
+        return least_bound_c_max
+
+    def _impl(self, queue: Iterable, upper_bound: IntPtr, pi_star: Order):
+        # expand single node, children go to least bound heap
+        expanded = self._expand(queue, upper_bound, pi_star)
+        if expanded is None:
+            return
+
+        c_task_index, block, eliminated = expanded
+        c_task = queue[c_task_index]
+
+        for on_r in (True, False):
+            least_bound_c_max = self._branch(queue, c_task_index, c_task, block, on_r, upper_bound)
+            if least_bound_c_max is not None:
+                # node number breaks ties so that queues are never compared
+                heapq.heappush(self.tasks_from_recursion, (least_bound_c_max, self.stats.generated, [*queue]))
+            queue[c_task_index] = c_task
+
+        CarlierResolver._restore(queue, eliminated)
+
+    def _bfs(self, queue: Iterable, upper_bound: IntPtr, pi_star: Order):
+        self._impl(queue, upper_bound, pi_star)
+
+        while len(self.tasks_from_recursion) > 0:
+            least_bound, _, processing = heapq.heappop(self.tasks_from_recursion)
+
+            # upper bound could have improved since node was generated
+            if least_bound >= upper_bound.val:
+                self.stats.pruned += 1
+                continue
+
+            # least bound of node being expanded is needed for result
+            self.least_bound = least_bound
+            self._impl(processing, upper_bound, pi_star)
+
+    def _dfs(self, queue: Iterable, upper_bound: IntPtr, pi_star: Order):
+        # depth first search on explicit stack, nodes are explored in the same
+        # order as recursion would do: R branch subtree, then Q branch subtree.
+        # Queue is shared by all nodes, each stack record keeps
+        # [c task index, original c task, block, next branch, eliminated]
+        # to restore it.
+        stack = []
+
+        expanded = self._expand(queue, upper_bound, pi_star)
+        if expanded is not None:
+            c_task_index, block, eliminated = expanded
+            stack.append([c_task_index, queue[c_task_index], block, 0, eliminated])
+
+        while len(stack) != 0:
+            node = stack[-1]
+            c_task_index, c_task, block, branch, eliminated = node
+
+            # undo previous branch of this node
+            queue[c_task_index] = c_task
+
+            if branch == 2:
+                CarlierResolver._restore(queue, eliminated)
+                stack.pop()
+                continue
+            node[3] += 1
+
+            if self._branch(queue, c_task_index, c_task, block, branch == 0, upper_bound) is None:
+                continue
+
+            expanded = self._expand(queue, upper_bound, pi_star)
+            if expanded is None:
+                continue
+
+            c_task_index, block, eliminated = expanded
+            stack.append([c_task_index, queue[c_task_index], block, 0, eliminated])
+
+    def _count_stats(self):
+        counters = self.instrumentation.counters
+        counters['nodes'] += self.stats.expanded
+        counters['prunes'] += self.stats.pruned
+        for field in ('generated', 'schrage_calls', 'pmtn_calls', 'cache_hits', 'eliminated', 'duplicates'):
+            counters[field] += getattr(self.stats, field)
+
+    def reset_caches(self):
+        self.schrage_cache = LRUCache(self.cache_size)
+        self.pmtn_cache = LRUCache(self.cache_size)
+        self.generated_nodes = set()
+
+    def _result(self, pi_star: Order, upper_bound, stop_reason, least_bound) -> CarlierResult:
+        if stop_reason == 'completed':
+            lower_bound = upper_bound
+        else:
+            # node being expanded and everything left in frontier
+            bounds = (bound for bound, _, _ in self.tasks_from_recursion)
+            lower_bound = min(least_bound, upper_bound, *bounds)
+
+        return CarlierResult(
+            order=Permutation.of(pi_star),
+            c_max=upper_bound,
+            lower_bound=lower_bound,
+            proven_optimal=lower_bound >= upper_bound,
+            stop_reason=stop_reason,
+            stats=self.stats)
+
+    def solve(self, queue: Iterable) -> CarlierResult:
+        pi_star = Order(order=None)
+        upper_bound = IntPtr(math.inf)
+        self.current_cmax_iter = 0
+        self.tasks_from_recursion = []
+        self.stats = CarlierStats()
+        self.start_time = perf_counter()
+        self.next_memory_check = 0
+        self.reset_caches()
+        stop_reason = 'completed'
 
+        queue = [*queue]
+        if self.instrumentation is not None:
+            self.instrumentation.start()
+        self.least_bound = self._least_bound(queue)
+
+        try:
+            if self.strategy == CarlierStrategy.Normal:
+                self._dfs(queue, upper_bound, pi_star)
+            else:
+                self._bfs(queue, upper_bound, pi_star)
 
+        except CarlierDoneException as e:
+            stop_reason = e.reason
 
-    def _recursion_on_r(self, queue, order, c_order_index, K, upper_bound: IntPtr, pi_star: Order):
-        r_task = queue[order[c_order_index]]
-        queue[order[c_order_index]] = RPQTask(
-            task_no = r_task.task_no,
-            R = max(r_task.R, CarlierResolver.r_func(K, queue, order) + CarlierResolver.p_func(K, queue, order)),
-            P = r_task.P,
-            Q = r_task.Q
-        )
+        if self.instrumentation is not None:
+            self._count_stats()
 
-        _, least_bound_c_max = self.schrage().pmtn_resolve([*queue])
-        least_bound_c_max = max(least_bound_c_max, CarlierResolver.h_func(K, queue, order), CarlierResolver.h_func([c_order_index] + K, queue, order))
+        return self._result(pi_star, upper_bound.val, stop_reason, self.least_bound)
 
-        if least_bound_c_max < upper_bound.val:
-            self.add_vertex(queue, upper_bound, pi_star, least_bound_c_max)
+    def resolve(self, queue: Iterable) -> Order:
+        result = self.solve(queue)
+        return [
+            result.order,
+            IntPtr(result.c_max)]
 
-        queue[order[c_order_index]] = r_task
+    def __repr__(self):
+        return f"CarlierResolver({self.schrage}, {self.strategy})"
 
-    def _recursion_on_q(self, queue, order, c_order_index, K, upper_bound, pi_star):
-        r_task = queue[order[c_order_index]]
-        queue[order[c_order_index]] = RPQTask(
-            task_no = r_task.task_no,
-            R = r_task.R,
-            P = r_task.P,
-            Q = max(r_task.Q, CarlierResolver.q_func(K, queue, order) + CarlierResolver.p_func(K, queue, order))
-        )
 
-        _, least_bound_c_max = self.schrage().pmtn_resolve([*queue])
-        least_bound_c_max = max(least_bound_c_max, CarlierResolver.h_func(K, queue, order), CarlierResolver.h_func([c_order_index] + K, queue, order))
+# worker side of ParallelCarlierResolver, set by pool initializer
+_parallel_carlier_worker = None
+
+def _parallel_carlier_init(schrage, upper_bound, pi_star, elimination, instance):
+    global _parallel_carlier_worker
+    # budget is enforced by the master process
+    _parallel_carlier_worker = ParallelCarlierResolver(schrage, budget=CarlierBudget(max_stagnation=None), elimination=elimination)
+    _parallel_carlier_worker.shared_upper_bound = SharedIntPtr(None, upper_bound)
+    _parallel_carlier_worker.shared_pi_star = pi_star
+    # task_no and P never change during branching, they are read once
+    _parallel_carlier_worker.task_nos, _parallel_carlier_worker.P = attach(instance).T.tolist()
+    # caches and duplicate detection are kept per worker for the whole run
+    _parallel_carlier_worker.reset_caches()
+
+def _parallel_carlier_expand(node):
+    return _parallel_carlier_worker.expand(node)
+
+
+# Nodes are sent between processes as (2, n) int64 arrays of R and Q, task_no
+# and P of the instance are published once in shared memory.
+class ParallelCarlierResolver(CarlierResolver):
+    def __init__(self, schrage, processes=None, batch_size=4, budget: CarlierBudget=None, elimination=False):
+        super().__init__(CarlierStrategy.BFS, schrage, budget, elimination=elimination)
+        self.processes = processes or os.cpu_count()
+        self.batch_size = batch_size
+
+    def _update_upper_bound(self, order: Order, c_max, upper_bound: SharedIntPtr, pi_star) -> bool:
+        # cheap unlocked check first, bound only ever goes down
+        if c_max >= upper_bound.val:
+            return False
+
+        with upper_bound.get_lock():
+            if c_max >= upper_bound.val:
+                return False
+            self.shared_pi_star[:] = order.order
+            upper_bound.val = c_max
+            return True
 
-        if least_bound_c_max < upper_bound.val:
-            self.add_vertex(queue, upper_bound, pi_star, least_bound_c_max)
+    @staticmethod
+    def _node(queue) -> np.ndarray:
+        return np.array([[task.R for task in queue], [task.Q for task in queue]], dtype=np.int64)
 
-        queue[order[c_order_index]] = r_task
+    def _node_queue(self, node):
+        R, Q = node.tolist()
+        return [RPQTask(task_no, r, p, q) for task_no, r, p, q in zip(self.task_nos, R, self.P, Q)]
 
-    def resolve(self, queue: Iterable) -> Order:
-        pi_star = Order(order=None)
-        upper_bound = IntPtr(math.inf)
-        self.max_iter = 1000
-        self.current_cmax_iter = 0
+    def expand(self, node):
+        # expand single node, children are returned instead of being explored,
+        # stagnation is counted by the master process
+        queue = self._node_queue(node)
         self.tasks_from_recursion = []
+        self.stats = CarlierStats()
+        self.start_time = perf_counter()
+        self.next_memory_check = 0
+        self.current_cmax_iter = 0
+        done = False
 
         try:
-            self._impl(deepcopy(queue), upper_bound, pi_star)
-
-            while len(self.tasks_from_recursion) > 0:
-                processing = min(self.tasks_from_recursion, key=lambda obj: obj[1])
-                self.tasks_from_recursion.remove(processing)
-                self._impl(processing[0], upper_bound, pi_star)
-
+            self._impl(queue, self.shared_upper_bound, None)
         except CarlierDoneException:
-            pass
+            done = True
+
+        children = [(least_bound, ParallelCarlierResolver._node(child)) for least_bound, _, child in self.tasks_from_recursion]
+        return children, self.stats, done
+
+    def solve(self, queue: Iterable) -> CarlierResult:
+        queue = [*queue]
+        upper_bound = SharedIntPtr(math.inf)
+        pi_star = multiprocessing.Array('i', len(queue), lock=False)
+        self.stats = CarlierStats()
+        self.start_time = perf_counter()
+        self.next_memory_check = 0
+        self.reset_caches()
+        self.current_cmax_iter = 0
+        stop_reason = 'completed'
+
+        least_bound = self._least_bound(queue)
+        self.tasks_from_recursion = [(least_bound, 0, ParallelCarlierResolver._node(queue))]
+        node_no = 0
+
+        with SharedInstanceStore() as store, multiprocessing.Pool(
+                self.processes,
+                initializer=_parallel_carlier_init,
+                initargs=(self.schrage, upper_bound.shared, pi_star, self.elimination,
+                          store.publish(np.array([(task.task_no, task.P) for task in queue], dtype=np.int64).reshape(-1, 2)))) as pool:
+            frontier = self.tasks_from_recursion
+
+            try:
+                while len(frontier) > 0:
+                    self._check_budget()
+
+                    # hand off a batch of most promising nodes to the workers
+                    batch = []
+                    while len(frontier) > 0 and len(batch) < self.processes * self.batch_size:
+                        node = heapq.heappop(frontier)
+                        if node[0] >= upper_bound.val:
+                            self.stats.pruned += 1
+                            continue
+                        batch.append(node)
+
+                    if len(batch) == 0:
+                        break
+                    least_bound = batch[0][0]
+
+                    batch_upper_bound = upper_bound.val
+                    done = False
+                    for children, stats, node_done in pool.imap_unordered(_parallel_carlier_expand, (node for _, _, node in batch)):
+                        self.stats.add(stats)
+                        done = done or node_done
+
+                        for child_least_bound, child in children:
+                            node_no += 1
+                            heapq.heappush(frontier, (child_least_bound, node_no, child))
+
+                    if done:
+                        raise CarlierDoneException()
+
+                    if upper_bound.val < batch_upper_bound:
+                        self.current_cmax_iter = 0
+                    else:
+                        self.current_cmax_iter += len(batch)
+
+                    if self.budget.max_stagnation is not None and self.current_cmax_iter > self.budget.max_stagnation:
+                        raise CarlierDoneException('max_stagnation')
+
+            except CarlierDoneException as e:
+                stop_reason = e.reason
+
+        c_max = upper_bound.val
+        return self._result(Permutation(list(pi_star)), int(c_max), stop_reason, least_bound)
 
+    def resolve(self, queue: Iterable) -> Order:
+        result = self.solve(queue)
         return [
-            pi_star,
-            upper_bound]
+            result.order,
+            IntPtr(result.c_max)]
 
     def __repr__(self):
-        return f"CarlierResolver({self.schrage}, {self.strategy})"
+        return f"ParallelCarlierResolver({self.schrage}, processes={self.processes})"
+
+
+# Tabu search for 1|r_j,q_j|C_max seeded with schrage. Only moves that can
+# shorten the critical block a..b are tried: task with Q smaller than Q_b goes
+# behind b, task with R smaller than R_a goes in front of a, and both ends of
+# the block swap with their neighbours. At most neighbours_max of them are
+# sampled per iteration, so one iteration is O(neighbours_max * n). Moves are
+# evaluated from first changed position using completion times of current
+# order and stop as soon as completion times are the same as before, the rest
+# is taken from suffix maximum of C + Q.
+class RPQTsResolver(RPQResolver):
+    def __init__(self,
+            first_order: RPQResolver=SchrageLogNResolver(),
+            neighbours_max=50,
+            tabu_list_length=10,
+            stop_option: StopOption=TimeStopOption(1)):
+        self.first_order = first_order
+        self.neighbours_max = neighbours_max
+        self.tabu_list_length = tabu_list_length
+        self.stop_option = stop_option
+
+    def __repr__(self):
+        return f'RPQTsResolver:first_order={self.first_order.__class__.__name__}:neighbours={self.neighbours_max}:tabu_list_length={self.tabu_list_length}:stop_option={self.stop_option}'
+
+    def _completion_times(self, perm):
+        R, P, Q = self.R, self.P, self.Q
+        n = len(perm)
+        C = [0] * n
+        # prefix[i] -> max C + Q of positions 0..i, suffix[i] -> of positions i..n-1
+        prefix = [0] * n
+        suffix = [0] * (n + 1)
+
+        t = 0
+        cmax = 0
+        for position, task_index in enumerate(perm):
+            if R[task_index] > t:
+                t = R[task_index]
+            t += P[task_index]
+            C[position] = t
+            cmax = max(cmax, t + Q[task_index])
+            prefix[position] = cmax
+
+        for position in range(n - 1, -1, -1):
+            suffix[position] = max(suffix[position + 1], C[position] + Q[perm[position]])
+
+        return C, prefix, suffix
+
+    def _critical_block(self, perm, C, cmax):
+        R, Q = self.R, self.Q
+        b = max(position for position in range(len(perm)) if C[position] + Q[perm[position]] == cmax)
+
+        # block starts with task that waited for its release
+        a = b
+        while a > 0 and R[perm[a]] < C[a - 1]:
+            a -= 1
+        return a, b
+
+    def _moves(self, perm, a, b):
+        R, Q = self.R, self.Q
+        r_a, q_b = R[perm[a]], Q[perm[b]]
+
+        moves = set()
+        for position in range(a + 1, b + 1):
+            if R[perm[position]] < r_a:
+                moves.add((position, a))
+        for position in range(a, b):
+            if Q[perm[position]] < q_b:
+                moves.add((position, b))
+        if a < b:
+            moves.add((a, a + 1))
+            moves.add((b, b - 1))
+        moves = list(moves)
+
+        if self.neighbours_max is not None and len(moves) > self.neighbours_max:
+            moves = random.sample(moves, self.neighbours_max)
+        return moves
+
+    def _evaluate(self, perm, C, prefix, suffix, move):
+        # c_max after moving task from position to position
+        R, P, Q = self.R, self.P, self.Q
+        from_position, to_position = move
+        low, high = min(move), max(move)
+
+        if from_position < to_position:
+            changed = perm[from_position + 1:to_position + 1] + [perm[from_position]]
+        else:
+            changed = [perm[from_position]] + perm[to_position:from_position]
+
+        t = C[low - 1] if low > 0 else 0
+        cmax = prefix[low - 1] if low > 0 else 0
+
+        for task_index in changed:
+            if R[task_index] > t:
+                t = R[task_index]
+            t += P[task_index]
+            cmax = max(cmax, t + Q[task_index])
+
+        for position in range(high + 1, len(perm)):
+            if t == C[position - 1]:
+                return max(cmax, suffix[position])
+
+            task_index = perm[position]
+            if R[task_index] > t:
+                t = R[task_index]
+            t += P[task_index]
+            cmax = max(cmax, t + Q[task_index])
+
+        return cmax
+
+    def resolve(self, queue: list) -> Order:
+        queue = [*queue]
+        if len(queue) == 0:
+            return [Permutation([]), 0]
+
+        self.R = [task.R for task in queue]
+        self.P = [task.P for task in queue]
+        self.Q = [task.Q for task in queue]
+        queue_index = {task.task_no: task_index for task_index, task in enumerate(queue)}
+
+        first_order, _ = self.first_order.resolve([*queue])
+        perm = [queue_index[task_no] for task_no in first_order.order]
+
+        C, prefix, suffix = self._completion_times(perm)
+        current_c_max = prefix[-1]
+        best = list(perm)
+        best_c_max = current_c_max
+
+        tabu_list = TsResolver.TabuList(self.tabu_list_length)
+        self.stop_option.start()
+
+        while not self.stop_option.should_stop():
+            a, b = self._critical_block(perm, C, current_c_max)
+
+            moves = self._moves(perm, a, b)
+            if len(moves) == 0:
+                # critical block can't be shortened, order won't change
+                break
+
+            best_move, best_move_c_max = None, math.inf
+            for move in moves:
+                # checked per move, single iteration of big instance is long
+                if best_move is not None and self.stop_option.should_stop():
+                    break
+
+                c_max = self._evaluate(perm, C, prefix, suffix, move)
+
+                # tabu move is allowed only if it gives new best
+                if perm[move[0]] in tabu_list and c_max >= best_c_max:
+                    continue
+
+                if c_max < best_move_c_max:
+                    best_move, best_move_c_max = move, c_max
+
+            self.stop_option.next_iter()
+
+            if best_move is None:
+                continue
+
+            from_position, to_position = best_move
+            task_index = perm.pop(from_position)
+            perm.insert(to_position, task_index)
+            tabu_list.add(task_index)
+
+            C, prefix, suffix = self._completion_times(perm)
+            current_c_max = prefix[-1]
+
+            if current_c_max < best_c_max:
+                best_c_max = current_c_max
+                best = list(perm)
+
+        return [Permutation([queue[task_index].task_no for task_index in best]), best_c_max]
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Tuple
+import atexit
+
+import numpy as np
+
+from .grouped_tasks import GroupedTasks
+
+# Instance arrays published once in shared memory. Workers get small
+# SharedArrayHandle instead of pickled arrays and attach read only views.
+# Store owns the segments and unlinks them on close, at the latest when
+# interpreter exits.
+
+
+@dataclass(frozen=True)
+class SharedArrayHandle:
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedInstanceStore:
+    def __init__(self):
+        self.segments = {}
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def publish(self, array) -> SharedArrayHandle:
+        array = np.ascontiguousarray(array)
+        # zero sized segments are not allowed
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+        view[...] = array
+
+        self.segments[segment.name] = segment
+        return SharedArrayHandle(segment.name, array.shape, array.dtype.str)
+
+    def publish_grouped_tasks(self, grouped_tasks: GroupedTasks) -> SharedArrayHandle:
+        return self.publish(grouped_tasks.matrix)
+
+    def publish_rpq(self, queue) -> SharedArrayHandle:
+        # (n, 3) array of R, P, Q, queue index is task_no
+        return self.publish(np.array([(task.R, task.P, task.Q) for task in queue], dtype=np.int64).reshape(-1, 3))
+
+    def close(self):
+        for segment in self.segments.values():
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self.segments.clear()
+        atexit.unregister(self.close)
+
+
+# segments attached in this process, kept open as long as views may live
+_attached = {}
+
+
+def attach(handle: SharedArrayHandle) -> np.ndarray:
+    segment = _attached.get(handle.name)
+    if segment is None:
+        try:
+            # owner unlinks, attaching process must not track segment
+            segment = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:
+            # before python 3.13 workers share resource tracker of owner
+            segment = shared_memory.SharedMemory(name=handle.name)
+        _attached[handle.name] = segment
+
+    view = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=segment.buf)
+    view.flags.writeable = False
+    return view
+
+
+def attach_grouped_tasks(handle: SharedArrayHandle) -> GroupedTasks:
+    return GroupedTasks(attach(handle))
+
+
+def detach(handle: SharedArrayHandle):
+    # views of handle must not be used afterwards
+    segment = _attached.pop(handle.name, None)
+    if segment is not None:
+        segment.close()
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import List
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+
+import numpy as np
+
+from .grouped_tasks import GroupedTasks
+from .helpers import get_c_max
+from .lru_cache import LRUCache
+from .order import Permutation
+
+# Solutions of flowshop resolvers keyed by (instance content hash, resolver
+# configuration, resolver code version, seed). In-memory LRU sits in front of optional
+# sqlite file, so identical instances are solved once across runs. Code
+# version is hash of sources of resolver's package, any change there makes old
+# solutions unreachable. Only resolvers marked deterministic or given a seed
+# are cached by cached_resolve, others would always get the first result.
+
+
+@dataclass(frozen=True)
+class CachedSolution:
+    order: List[int]
+    makespan: float
+    # seconds the original resolve took
+    time: float
+
+
+def instance_hash(grouped_tasks: GroupedTasks) -> str:
+    matrix = np.ascontiguousarray(grouped_tasks.matrix, dtype=np.float64)
+    digest = hashlib.sha1(str(matrix.shape).encode())
+    digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+
+# package directory -> hash of its sources
+_code_versions = {}
+
+
+def resolver_version(resolver) -> str:
+    # resolvers call helpers from all over their package, so whole package is
+    # hashed instead of resolver class alone
+    module = sys.modules.get(type(resolver).__module__)
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return ''
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in _code_versions:
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py'):
+                digest.update(name.encode())
+                with open(os.path.join(directory, name), 'rb') as file:
+                    digest.update(file.read())
+        _code_versions[directory] = digest.hexdigest()
+    return _code_versions[directory]
+
+
+def _config_repr(value) -> str:
+    # functions by name and objects by their attributes, default repr has
+    # address which changes between runs
+    if callable(value) and hasattr(value, '__qualname__'):
+        return f'{value.__module__}.{value.__qualname__}'
+    if hasattr(value, '__dict__'):
+        return resolver_config(value)
+    return repr(value)
+
+
+def resolver_config(resolver) -> str:
+    # class with all attributes, any of them may change result while repr is
+    # written by hand and can leave some out
+    attributes = ', '.join(f'{name}={_config_repr(value)}' for name, value in sorted(vars(resolver).items()))
+    return f'{type(resolver).__module__}.{type(resolver).__qualname__}({attributes})'
+
+
+class SolutionCache:
+    def __init__(self, path=None, memory_size=256):
+        # path None keeps cache in memory only
+        self.path = path
+        self.memory = LRUCache(memory_size)
+        self.connection = None
+
+        if path is not None:
+            self.connection = sqlite3.connect(path)
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(solutions)')]
+            if len(columns) != 0 and 'version' not in columns:
+                # file from before code versions, its solutions can't be trusted
+                self.connection.execute('DROP TABLE solutions')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS solutions ('
+                'instance TEXT, resolver TEXT, version TEXT, seed TEXT, '
+                '"order" TEXT, makespan REAL, time REAL, '
+                'PRIMARY KEY (instance, resolver, version, seed))')
+            self.connection.commit()
+
+    def _key(self, instance, resolver, seed):
+        return (instance, resolver_config(resolver), resolver_version(resolver), repr(seed))
+
+    def get(self, instance, resolver, seed=None) -> CachedSolution:
+        key = self._key(instance, resolver, seed)
+        solution = self.memory.get(key)
+        if solution is not None or self.connection is None:
+            return solution
+
+        row = self.connection.execute(
+            'SELECT "order", makespan, time FROM solutions WHERE instance = ? AND resolver = ? AND version = ? AND seed = ?',
+            key).fetchone()
+        if row is None:
+            return None
+
+        solution = CachedSolution(json.loads(row[0]), row[1], row[2])
+        self.memory.put(key, solution)
+        return solution
+
+    def put(self, instance, resolver, seed, solution: CachedSolution):
+        key = self._key(instance, resolver, seed)
+        self.memory.put(key, solution)
+
+        if self.connection is not None:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (*key, json.dumps(solution.order), float(solution.makespan), solution.time))
+            self.connection.commit()
+
+    def clear(self):
+        self.memory = LRUCache(self.memory.max_size)
+        if self.connection is not None:
+            self.connection.execute('DELETE FROM solutions')
+            self.connection.commit()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+_default_cache = None
+
+
+def default_solution_cache() -> SolutionCache:
+    # in memory unless SPD_SOLUTION_CACHE names sqlite file
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SolutionCache(os.environ.get('SPD_SOLUTION_CACHE') or None)
+    return _default_cache
+
+
+def set_default_solution_cache(cache: SolutionCache):
+    global _default_cache
+    _default_cache = cache
+
+
+def cached_resolve(resolver, grouped_tasks: GroupedTasks, cache: SolutionCache=None, seed=None) -> Permutation:
+    # resolves through cache when resolver is deterministic or seed is given,
+    # seed is applied to random and numpy before resolving, returned order is
+    # a fresh copy
+    if not getattr(resolver, 'deterministic', False) and seed is None:
+        return resolver.resolve(grouped_tasks)
+
+    cache = cache or default_solution_cache()
+    instance = instance_hash(grouped_tasks)
+    solution = cache.get(instance, resolver, seed)
+
+    if solution is None:
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        start = perf_counter()
+        order = Permutation.of(resolver.resolve(grouped_tasks))
+        time = perf_counter() - start
+
+        solution = CachedSolution(order.tolist(), get_c_max(grouped_tasks, order), time)
+        cache.put(instance, resolver, seed, solution)
+
+    return Permutation(solution.order)
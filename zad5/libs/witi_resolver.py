@@ -0,0 +1,177 @@
+from collections import deque
+from typing import Iterable
+import math
+
+import numpy as np
+
+from .order import Order
+from .helpers import get_witi_cost
+
+# 1||sum w_j T_j - single machine total weighted tardiness. Queue index is
+# task_no, resolvers return [Order, cost] like RPQ ones.
+
+
+class WiTiResolver:
+    def resolve(self, queue: Iterable) -> Order:
+        raise RuntimeError("WiTiResolver::resolve(...): method not implemented")
+
+
+class WiTiDynamicResolver(WiTiResolver):
+    # F(S) = min over j in S of F(S - j) + w_j * max(0, sum p(S) - d_j), set S
+    # is bitmask index to flat array. Subsets with k tasks depend only on
+    # subsets with k - 1 tasks, so each popcount layer is one vectorised step.
+    def __init__(self, max_tasks=22):
+        self.max_tasks = max_tasks
+
+    def __repr__(self):
+        return 'WiTiDynamicResolver'
+
+    def resolve(self, queue: Iterable) -> Order:
+        queue = [*queue]
+        n = len(queue)
+        if n == 0:
+            return [Order([]), 0]
+        if n > self.max_tasks:
+            raise ValueError(f'WiTiDynamicResolver::resolve(...): {n} tasks, limit is {self.max_tasks}')
+
+        # sets with bit j are sets without it shifted by 2^j, so time and
+        # popcount of all sets are built by doubling
+        time = np.zeros(1 << n, dtype=np.int64)
+        popcount = np.zeros(1 << n, dtype=np.int8)
+        for j, task in enumerate(queue):
+            time[1 << j:2 << j] = time[:1 << j] + task.P
+            popcount[1 << j:2 << j] = popcount[:1 << j] + 1
+
+        # time, cost, popcount and last take 18 bytes per set, biggest layer
+        # adds about 60 bytes per its set, for 22 tasks it is 120 MB
+        cost = np.zeros(1 << n, dtype=np.int64)
+        last = np.zeros(1 << n, dtype=np.int8)
+
+        for k in range(1, n + 1):
+            layer = np.flatnonzero(popcount == k)
+            layer_time = time[layer]
+            best = np.full(len(layer), np.iinfo(np.int64).max, dtype=np.int64)
+            best_last = np.zeros(len(layer), dtype=np.int8)
+
+            for j, task in enumerate(queue):
+                has = ((layer >> j) & 1).astype(bool)
+                # masks without j point outside the previous layer, they are
+                # cut off by has
+                candidate = cost[layer ^ (1 << j)] + task.W * np.maximum(layer_time - task.D, 0)
+                better = has & (candidate < best)
+                best = np.where(better, candidate, best)
+                best_last = np.where(better, j, best_last)
+
+            cost[layer] = best
+            last[layer] = best_last
+
+        order = deque()
+        mask = (1 << n) - 1
+        while mask != 0:
+            j = int(last[mask])
+            order.appendleft(queue[j].task_no)
+            mask ^= 1 << j
+
+        return [Order(list(order)), int(cost[-1])]
+
+
+class WiTiATCResolver(WiTiResolver):
+    # apparent tardiness cost dispatching for few look ahead values k, best
+    # sequence is improved by moving single tasks while it helps
+    def __init__(self, k_values=(0.5, 1, 2, 4), insert_window=20, max_passes=10):
+        self.k_values = k_values
+        # how far a task may be moved, None allows any position
+        self.insert_window = insert_window
+        self.max_passes = max_passes
+
+    def __repr__(self):
+        return f'WiTiATCResolver(k={self.k_values}, window={self.insert_window})'
+
+    def _atc(self, queue, k):
+        # pick task with max w/p * exp(-slack / (k * p_avg)), O(n^2)
+        p_avg = sum(task.P for task in queue) / len(queue)
+        unscheduled = list(range(len(queue)))
+        order = []
+        time = 0
+
+        while len(unscheduled) != 0:
+            def priority(task_index):
+                task = queue[task_index]
+                slack = max(task.D - task.P - time, 0)
+                return task.W / task.P * math.exp(-slack / (k * p_avg))
+
+            i = max(range(len(unscheduled)), key=lambda i: priority(unscheduled[i]))
+            task_index = unscheduled[i]
+            unscheduled[i] = unscheduled[-1]
+            unscheduled.pop()
+
+            order.append(task_index)
+            time += queue[task_index].P
+
+        return order
+
+    def _insert_pass(self, queue, order):
+        # for each position make the best move of its task. Moving task from
+        # i to j changes completion time of tasks in between by p of moved
+        # task, so move costs O(|i - j|). Returns True on any improvement.
+        n = len(order)
+        window = n if self.insert_window is None else self.insert_window
+        improved = False
+        changed = True
+
+        def tardiness(position, completion):
+            return W[position] * max(completion - D[position], 0)
+
+        for i in range(n):
+            if changed:
+                P = [queue[task_index].P for task_index in order]
+                W = [queue[task_index].W for task_index in order]
+                D = [queue[task_index].D for task_index in order]
+
+                C = [0] * n
+                time = 0
+                for position in range(n):
+                    time += P[position]
+                    C[position] = time
+                changed = False
+
+            best_delta, best_j = 0, None
+
+            # moving later, tasks i + 1..j finish P[i] earlier
+            delta = -tardiness(i, C[i])
+            for j in range(i + 1, min(n, i + window + 1)):
+                delta += tardiness(j, C[j] - P[i]) - tardiness(j, C[j])
+                if delta + tardiness(i, C[j]) < best_delta:
+                    best_delta, best_j = delta + tardiness(i, C[j]), j
+
+            # moving earlier, tasks j..i - 1 finish P[i] later
+            delta = -tardiness(i, C[i])
+            for j in range(i - 1, max(-1, i - window - 1), -1):
+                delta += tardiness(j, C[j] + P[i]) - tardiness(j, C[j])
+                start = C[j - 1] if j > 0 else 0
+                if delta + tardiness(i, start + P[i]) < best_delta:
+                    best_delta, best_j = delta + tardiness(i, start + P[i]), j
+
+            if best_j is not None:
+                order.insert(best_j, order.pop(i))
+                improved = changed = True
+
+        return improved
+
+    def resolve(self, queue: Iterable) -> Order:
+        queue = [*queue]
+        if len(queue) == 0:
+            return [Order([]), 0]
+
+        best, best_cost = None, math.inf
+        for k in self.k_values:
+            order = self._atc(queue, k)
+            cost = get_witi_cost(queue, Order(order))
+            if cost < best_cost:
+                best, best_cost = order, cost
+
+        for _ in range(self.max_passes):
+            if not self._insert_pass(queue, best):
+                break
+
+        return [Order([queue[task_index].task_no for task_index in best]), get_witi_cost(queue, Order(best))]
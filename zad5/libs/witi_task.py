@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WiTiTask:
+    task_no: int
+    P: int
+    W: int
+    D: int
+
+    def __lt__(self, other):
+        return self.task_no < other.task_no
@@ -5,7 +5,7 @@ import csv
 
 from libs.rpq_task import RPQTask
 from libs.load_file import load_file, rpq_load_file
-from libs.rpq_resolver import CarlierStrategy, SchrageN2Resolver, SchrageLogNResolver, CarlierResolver
+from libs.rpq_resolver import CarlierStrategy, SchrageN2Resolver, SchrageLogNResolver, CarlierResolver, ParallelCarlierResolver
 from libs.priority_queue import PriorityQueue
 from libs.helpers import RPQtime_resolve, create_random_rpq_task_queue, get_c_max_rpq
 
@@ -28,7 +28,8 @@ def main():
         #CarlierResolver(CarlierStrategy.BFS, SchrageN2Resolver),
         CarlierResolver(CarlierStrategy.BFS, SchrageLogNResolver),
         #CarlierResolver(CarlierStrategy.Normal, SchrageN2Resolver),
-        #CarlierResolver(CarlierStrategy.Normal, SchrageLogNResolver)
+        #CarlierResolver(CarlierStrategy.Normal, SchrageLogNResolver),
+        #ParallelCarlierResolver(SchrageLogNResolver),
         ]
 
     global_result = defaultdict(lambda: dict())
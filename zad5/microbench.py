@@ -0,0 +1,26 @@
+import argparse
+
+from libs.microbench import benchmarks, run_microbenchmarks, MicroResultsStore, compare_commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='micro benchmarks of core kernels')
+    parser.add_argument('--names', nargs='+', choices=benchmarks())
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--store', default='.microbench.jsonl')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help='compare stored commits instead of running')
+    args = parser.parse_args()
+
+    store = MicroResultsStore(args.store)
+
+    if args.compare:
+        for name, size, base_ns, head_ns, ratio in compare_commits(store, *args.compare):
+            print(f'{name} n={size}: {base_ns:.0f} ns -> {head_ns:.0f} ns ({ratio:.2f}x)')
+        return
+
+    store.append(run_microbenchmarks(args.names, args.sizes, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import csv
+
+from libs.rpq_benchmark import default_entries, run_rpq_benchmark, exponents
+from libs.rpq_resolver import CarlierBudget
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RPQ resolvers scaling benchmark')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10, 20, 50, 100, 200, 500])
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--carlier-nodes', type=int, default=2000, help='node budget of carlier')
+    parser.add_argument('--output', default='rpq_benchmark.csv')
+    args = parser.parse_args()
+
+    results = run_rpq_benchmark(default_entries(CarlierBudget(max_nodes=args.carlier_nodes)), args.sizes, args.repetitions)
+    fitted = exponents(results)
+
+    with open(args.output, 'w', newline='') as output:
+        writer = csv.writer(output, delimiter=';')
+
+        for name, entry_results in results.items():
+            writer.writerow(('ilosc_zadan', 'mediana_czasu', 'iqr_czasu', 'wezly', 'wywolania_schrage', 'pamiec'))
+            writer.writerow((name, f'wykladnik={fitted[name]:.2f}'))
+            for result in entry_results:
+                writer.writerow((
+                    result.size,
+                    result.median_time(),
+                    result.iqr_time(),
+                    result.median_metric('nodes'),
+                    result.median_metric('schrage_calls'),
+                    result.peak_memory))
+            writer.writerow(())
+
+    for name, exponent in fitted.items():
+        print(f'{name}: O(n^{exponent:.2f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+from collections import defaultdict
+import csv
+
+from libs.load_file import witi_load_file
+from libs.witi_resolver import WiTiDynamicResolver, WiTiATCResolver
+from libs.helpers import RPQtime_resolve, get_witi_cost
+
+
+def main():
+    filenames = ['../zad6/witi/data.10', '../zad6/witi/data.20']
+
+    resolvers_factory = [
+        WiTiDynamicResolver(),
+        WiTiATCResolver(),
+        ]
+
+    global_result = defaultdict(lambda: dict())
+
+    for filename in filenames:
+        task_t = tuple(witi_load_file(filename))
+        for resolver in resolvers_factory:
+            [[order, cost], time] = RPQtime_resolve(resolver, [*task_t])
+            global_result[resolver][filename] = (cost, time)
+            print(f'Done: {filename}--{resolver}')
+            print("Time: " + str(time))
+            print("Cost: " + str(cost) + ", other cost: " + str(get_witi_cost(task_t, order)))
+            print("Result: " + str(order))
+            print()
+
+    with open('witi_output.csv', 'w', newline='') as output:
+        writer = csv.writer(output, delimiter=';')
+
+        for resolver, tasks_to_results in global_result.items():
+            writer.writerow(('nazwa', 'czas', 'koszt'))
+            writer.writerow((resolver, ))
+            for task, result_and_time in tasks_to_results.items():
+                cost, time = result_and_time
+                writer.writerow((task, str(time), cost))
+            writer.writerow(())
+
+if __name__ == '__main__':
+    main()